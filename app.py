@@ -1,11 +1,17 @@
+import time
+
 import streamlit as st
 
-from services.openai_service import (
-    call_openai_for_recommendations,
-    create_analysis_prompt,
-    verify_and_enrich_recommendations,
+from services.events import ServiceError
+from services.jobs import DiscoveryJob, get_discovery_job, submit_discovery_job
+from services.result_store import load_result, store_resolved_videos
+from services.spotify_service import initialize_spotify
+from services.tracing import start_metrics_server
+from services.warmup import cache_warmup_pending, start_cache_warmup
+from services.youtube_service import (
+    prefetch_recommendation_videos,
+    resolve_recommendation_video,
 )
-from services.spotify_service import get_artist_data
 from ui.components.artist_profile import render_artist_profile
 from ui.components.config_sidebar import AppConfig, render_config_sidebar
 from ui.components.filters import filter_and_sort_artists, render_filters_and_sort
@@ -15,10 +21,14 @@ from ui.components.layout import (
     render_hero,
     render_nav,
     render_no_result,
+    render_events,
     render_setup_hint,
 )
 from ui.components.loading import render_loading
-from ui.components.recommendation_card import render_recommendation_card
+from ui.components.recommendation_card import (
+    render_recommendation_card,
+    render_recommendation_previews,
+)
 from ui.components.recommendation_detail import render_recommendation_detail
 from ui.components.search import render_compact_search_bar, render_search
 from ui.i18n import (
@@ -30,7 +40,9 @@ from ui.i18n import (
     show_locale_switch_hint,
     t,
 )
-from ui.theme import inject_global_css
+from ui.theme import EXAMPLE_ARTISTS, inject_global_css
+
+JOB_POLL_INTERVAL = 0.5
 
 
 def init_session_state() -> None:
@@ -42,6 +54,11 @@ def init_session_state() -> None:
         "selected_rec_index": None,
         "loading_step": 0,
         "discovery_target": None,
+        "discovery_refresh": False,
+        "discovery_job_id": None,
+        "discovery_events": [],
+        "result_id": None,
+        "result_from_store": False,
         "recommendations_ready": False,
         "current_artist_data": None,
         "recommendations": {},
@@ -58,6 +75,9 @@ def init_session_state() -> None:
 
 def go_home() -> None:
     st.session_state.screen = "home"
+    for param in ("r", "rec"):
+        if param in st.query_params:
+            del st.query_params[param]
     st.session_state.discovery_target = None
     st.session_state.selected_rec_index = None
     st.session_state.filter_type = "all"
@@ -66,6 +86,13 @@ def go_home() -> None:
 
 
 def reset_discovery() -> None:
+    st.session_state.discovery_job_id = None
+    st.session_state.result_id = None
+    st.session_state.result_from_store = False
+    for param in ("job", "r", "rec"):
+        if param in st.query_params:
+            del st.query_params[param]
+    st.session_state.discovery_events = []
     st.session_state.recommendations_ready = False
     st.session_state.current_artist_data = None
     st.session_state.recommendations = {}
@@ -78,61 +105,134 @@ def reset_discovery() -> None:
 def select_rec(idx: int) -> None:
     st.session_state.selected_rec_index = idx
     st.session_state.screen = "detail"
+    if st.session_state.result_id:
+        st.query_params["rec"] = str(idx)
     st.rerun()
 
 
-def start_discovery(artist_name: str) -> None:
+def start_discovery(artist_name: str, refresh: bool = False) -> None:
     st.session_state.query = artist_name
     st.session_state.discovery_target = artist_name
+    st.session_state.discovery_refresh = refresh
     st.session_state.screen = "loading"
     st.session_state.loading_step = 0
     reset_discovery()
     st.rerun()
 
 
-def run_discovery_pipeline(artist_name: str, config: AppConfig) -> None:
-    load_placeholder = st.empty()
-
-    def show_step(step: int) -> None:
-        st.session_state.loading_step = step
-        with load_placeholder.container():
-            render_loading(artist_name=artist_name, step=step)
+def finish_discovery(job: DiscoveryJob) -> None:
+    st.session_state.discovery_job_id = None
+    st.session_state.discovery_target = None
+    if "job" in st.query_params:
+        del st.query_params["job"]
 
-    show_step(0)
+    st.session_state.discovery_events = list(job.events)
+    if job.status == "failed":
+        st.session_state.discovery_events.append(
+            ServiceError("errors.discovery_failed", {"error": job.error})
+        )
 
-    show_step(1)
-    artist_data = get_artist_data(st.session_state.spotify_client, artist_name)
-    if not artist_data:
+    result = job.result or {"status": "no_result"}
+    if result.get("artist_data"):
+        st.session_state.current_artist_data = result["artist_data"]
+    if result["status"] == "results":
+        st.session_state.recommendations = result["recommendations"]
+        st.session_state.recommendations_ready = True
+        st.session_state.screen = "results"
+        st.session_state.result_id = result.get("result_id")
+        if st.session_state.result_id:
+            st.query_params["r"] = st.session_state.result_id
+    else:
         st.session_state.screen = "no_result"
-        st.session_state.discovery_target = None
-        st.rerun()
+    clear_locale_switch_flag()
+    st.rerun()
 
-    st.session_state.current_artist_data = artist_data
 
-    show_step(2)
-    analysis_prompt = create_analysis_prompt(artist_data, locale=get_locale())
-    ia_response = call_openai_for_recommendations(analysis_prompt, config.openai_api_key)
-    if not ia_response:
-        st.session_state.screen = "no_result"
-        st.session_state.discovery_target = None
+def run_discovery_pipeline(artist_name: str, config: AppConfig) -> None:
+    job = None
+    if st.session_state.discovery_job_id:
+        job = get_discovery_job(st.session_state.discovery_job_id)
+    if job is None:
+        job_id = submit_discovery_job(
+            st.session_state.spotify_client,
+            artist_name,
+            config.openai_api_key,
+            locale=get_locale(),
+            refresh=st.session_state.discovery_refresh,
+        )
+        st.session_state.discovery_job_id = job_id
+        st.query_params["job"] = job_id
+        job = get_discovery_job(job_id)
+
+    st.session_state.loading_step = job.step
+    render_loading(artist_name=artist_name, step=job.step)
+    render_recommendation_previews(list(job.previews))
+
+    if not job.finished:
+        time.sleep(JOB_POLL_INTERVAL)
         st.rerun()
 
-    show_step(3)
-    enriched_recs = verify_and_enrich_recommendations(
-        st.session_state.spotify_client,
-        ia_response["recommendations"],
-        config.youtube_api_key,
-    )
+    finish_discovery(job)
 
-    st.session_state.recommendations = {
-        "analysis": ia_response["analysis"],
-        "artists": enriched_recs,
-    }
-    st.session_state.recommendations_ready = bool(enriched_recs)
-    st.session_state.discovery_target = None
-    st.session_state.screen = "results" if enriched_recs else "no_result"
-    clear_locale_switch_flag()
-    st.rerun()
+
+def resume_discovery_from_url() -> None:
+    """Reprend le suivi d'un job en cours après une reconnexion (paramètre ?job=)."""
+    job_id = st.query_params.get("job")
+    if not job_id or st.session_state.discovery_job_id == job_id:
+        return
+    job = get_discovery_job(job_id)
+    if job is None:
+        del st.query_params["job"]
+        return
+    st.session_state.discovery_job_id = job_id
+    st.session_state.discovery_target = job.artist_name
+    st.session_state.query = job.artist_name
+    st.session_state.screen = "loading"
+
+
+def open_result_from_url() -> None:
+    """Affiche un résultat partagé (?r=<id>, ?rec=<rang>) depuis le store, sans appel externe."""
+    rid = st.query_params.get("r")
+    if not rid or st.session_state.result_id == rid:
+        return
+    stored = load_result(rid)
+    if stored is None:
+        del st.query_params["r"]
+        return
+
+    rec_param = st.query_params.get("rec", "")
+    reset_discovery()
+    st.query_params["r"] = rid
+    st.session_state.result_id = rid
+    st.session_state.result_from_store = True
+    st.session_state.current_artist_data = stored["artist_data"]
+    st.session_state.recommendations = stored["recommendations"]
+    st.session_state.recommendations_ready = True
+    st.session_state.query = stored["artist_data"].artist.name
+    st.session_state.screen = "results"
+
+    if rec_param.isdigit() and int(rec_param) < len(stored["recommendations"].get("artists", [])):
+        st.session_state.selected_rec_index = int(rec_param)
+        st.session_state.screen = "detail"
+        st.query_params["rec"] = rec_param
+
+
+def start_background_warmup() -> None:
+    """Préchauffe le store avec les clés du serveur (secrets.toml), jamais avec celles d'un visiteur."""
+    # Appelé à chaque rerun de chaque session : rien à faire une fois le préchauffage lancé.
+    if not cache_warmup_pending():
+        return
+    try:
+        secrets = st.secrets
+        openai_api_key = str(secrets.get("OPENAI_API_KEY", "") or "").strip()
+        client_id = str(secrets.get("SPOTIFY_CLIENT_ID", "") or "").strip()
+        client_secret = str(secrets.get("SPOTIFY_CLIENT_SECRET", "") or "").strip()
+    except Exception:
+        return
+    if not (openai_api_key and client_id and client_secret):
+        return
+    spotify = initialize_spotify(client_id, client_secret, silent=True)
+    start_cache_warmup(spotify, openai_api_key, EXAMPLE_ARTISTS)
 
 
 def main() -> None:
@@ -148,6 +248,10 @@ def main() -> None:
     render_locale_detector()
 
     init_session_state()
+    start_metrics_server()
+    start_background_warmup()
+    resume_discovery_from_url()
+    open_result_from_url()
     inject_global_css()
     config = render_config_sidebar()
 
@@ -178,6 +282,7 @@ def main() -> None:
 
     elif screen == "no_result":
         render_nav(spotify_connected=spotify_connected)
+        render_events(st.session_state.discovery_events)
         render_no_result(
             st.session_state.get("query", ""),
             on_example=start_discovery,
@@ -185,10 +290,11 @@ def main() -> None:
         )
 
     elif screen == "results" and st.session_state.recommendations_ready:
-        artist_info = st.session_state.current_artist_data["info"]
+        artist = st.session_state.current_artist_data.artist
         render_nav(spotify_connected=spotify_connected, compact=False)
-        render_compact_search_bar(artist_info["name"], on_home=go_home)
+        render_compact_search_bar(artist.name, on_home=go_home)
         show_locale_switch_hint()
+        render_events(st.session_state.discovery_events)
 
         recommendations = st.session_state.recommendations
         render_artist_profile(
@@ -208,10 +314,19 @@ def main() -> None:
                 index=original_index,
                 on_select=select_rec,
             )
-
-        if st.button(t("results.new_search"), key="new_search"):
-            reset_discovery()
-            go_home()
+        # Un résultat ouvert depuis un lien partagé ne déclenche aucun appel externe.
+        if not st.session_state.result_from_store:
+            prefetch_recommendation_videos(filtered, config.youtube_api_key)
+        store_resolved_videos(st.session_state.result_id, artists)
+
+        col_new, col_refresh = st.columns(2)
+        with col_new:
+            if st.button(t("results.new_search"), key="new_search"):
+                reset_discovery()
+                go_home()
+        with col_refresh:
+            if st.button(t("results.refresh"), key="refresh_discovery"):
+                start_discovery(artist.name, refresh=True)
 
     elif screen == "detail" and st.session_state.recommendations_ready:
         artists = st.session_state.recommendations.get("artists", [])
@@ -224,9 +339,22 @@ def main() -> None:
         render_nav(spotify_connected=spotify_connected, compact=True)
         show_locale_switch_hint()
 
+        if (
+            config.youtube_api_key
+            and not st.session_state.result_from_store
+            and not rec["spotify_data"].youtube_resolved
+        ):
+            with st.spinner(t("detail.video_loading")):
+                _, quota_exceeded = resolve_recommendation_video(rec, config.youtube_api_key)
+            if quota_exceeded:
+                st.warning(t("errors.youtube_quota"))
+            store_resolved_videos(st.session_state.result_id, [rec])
+
         def back_to_results() -> None:
             st.session_state.screen = "results"
             st.session_state.selected_rec_index = None
+            if "rec" in st.query_params:
+                del st.query_params["rec"]
             st.rerun()
 
         render_recommendation_detail(
@@ -0,0 +1,177 @@
+"""Découverte en lot, sans interface : un artiste de départ par ligne, un résultat JSON par ligne.
+
+    python batch_discovery.py seeds.txt -o results.jsonl --concurrency 4 --locale en
+    cat seeds.txt | python batch_discovery.py - -o results.jsonl
+
+Le fichier de sortie sert aussi de point de reprise : relancée avec le même fichier,
+la commande ignore les artistes déjà traités (sauf ceux en erreur).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, TextIO
+
+import spotipy
+
+from services.concurrency import get_pool
+from services.discovery import run_discovery
+from services.localization import SUPPORTED_LOCALES
+from services.records import recommendations_to_dict
+from services.settings import PROJECT_ROOT
+from services.spotify_service import get_spotify_client
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10 : clés uniquement par variables d'environnement
+    tomllib = None
+
+SECRETS_PATH = PROJECT_ROOT / ".streamlit" / "secrets.toml"
+REQUIRED_KEYS = ("OPENAI_API_KEY", "SPOTIFY_CLIENT_ID", "SPOTIFY_CLIENT_SECRET")
+
+
+def load_keys() -> Dict[str, str]:
+    """Clés API depuis l'environnement, sinon depuis .streamlit/secrets.toml."""
+    secrets: Dict = {}
+    if tomllib is not None and SECRETS_PATH.exists():
+        try:
+            secrets = tomllib.loads(SECRETS_PATH.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            secrets = {}
+    return {
+        key: (os.environ.get(key, "").strip() or str(secrets.get(key, "") or "").strip())
+        for key in REQUIRED_KEYS
+    }
+
+
+def read_seeds(source: TextIO) -> List[str]:
+    seeds: List[str] = []
+    seen: Set[str] = set()
+    for line in source:
+        seed = line.strip()
+        if seed and not seed.startswith("#") and seed.casefold() not in seen:
+            seen.add(seed.casefold())
+            seeds.append(seed)
+    return seeds
+
+
+def completed_seeds(output_path: Path, locale: str) -> Set[str]:
+    """Artistes déjà présents dans le fichier de sortie pour cette langue (hors erreurs)."""
+    done: Set[str] = set()
+    if not output_path.exists():
+        return done
+    with output_path.open(encoding="utf-8") as output:
+        for line in output:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # ligne tronquée par une interruption
+            if row.get("locale") == locale and row.get("status") != "failed":
+                done.add(str(row.get("seed", "")).casefold())
+    return done
+
+
+def discover_seed(
+    spotify: spotipy.Spotify, seed: str, openai_api_key: str, locale: str, refresh: bool
+) -> Dict:
+    started = time.perf_counter()
+    row: Dict = {"seed": seed, "locale": locale}
+    try:
+        result = run_discovery(spotify, seed, openai_api_key, locale=locale, refresh=refresh)
+        row.update(
+            status=result["status"],
+            result_id=result.get("result_id"),
+            artist_data=result["artist_data"].to_dict() if result["artist_data"] else None,
+            recommendations=(
+                recommendations_to_dict(result["recommendations"])
+                if result["recommendations"]
+                else {}
+            ),
+            events=[
+                dict(event.to_dict(), message=event.message(locale)) for event in result["events"]
+            ],
+        )
+    except Exception as e:
+        row.update(status="failed", error=str(e), events=[])
+    row["duration_ms"] = round((time.perf_counter() - started) * 1000)
+    return row
+
+
+def run_batch(
+    seeds: Iterable[str],
+    output_path: Path,
+    *,
+    locale: str,
+    concurrency: int,
+    refresh: bool,
+    resume: bool,
+    keys: Dict[str, str],
+) -> int:
+    """Traite les artistes en parallèle et ajoute chaque résultat au JSONL dès qu'il est prêt."""
+    done = completed_seeds(output_path, locale) if resume else set()
+    pending = [seed for seed in seeds if seed.casefold() not in done]
+    print(f"{len(pending)} seed(s) to process, {len(done)} already done", file=sys.stderr)
+    if not pending:
+        return 0
+
+    spotify = get_spotify_client(keys["SPOTIFY_CLIENT_ID"], keys["SPOTIFY_CLIENT_SECRET"])
+    pool = get_pool("batch", concurrency)
+    failures = 0
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("a" if resume else "w", encoding="utf-8") as output:
+        futures = [
+            pool.submit(discover_seed, spotify, seed, keys["OPENAI_API_KEY"], locale, refresh)
+            for seed in pending
+        ]
+        for position, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            failures += row["status"] == "failed"
+            output.write(json.dumps(row, ensure_ascii=False) + "\n")
+            output.flush()
+            print(
+                f"[{position}/{len(pending)}] {row['seed']}: {row['status']} ({row['duration_ms']} ms)",
+                file=sys.stderr,
+            )
+    return 1 if failures else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch discovery of similar artists (JSONL output).")
+    parser.add_argument("seeds", help="file with one seed artist per line, or - for stdin")
+    parser.add_argument("-o", "--output", required=True, help="JSONL output file (also the checkpoint)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="seeds processed in parallel")
+    parser.add_argument("--locale", choices=sorted(SUPPORTED_LOCALES), default="fr")
+    parser.add_argument("--refresh", action="store_true", help="ignore stored results and LLM cache")
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output file")
+    args = parser.parse_args(argv)
+
+    keys = load_keys()
+    missing = [key for key in REQUIRED_KEYS if not keys[key]]
+    if missing:
+        print(f"Missing API keys: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    if args.seeds == "-":
+        seeds = read_seeds(sys.stdin)
+    else:
+        with open(args.seeds, encoding="utf-8") as source:
+            seeds = read_seeds(source)
+
+    return run_batch(
+        seeds,
+        Path(args.output),
+        locale=args.locale,
+        concurrency=max(args.concurrency, 1),
+        refresh=args.refresh,
+        resume=not args.no_resume,
+        keys=keys,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from services.settings import CACHE_DIR
+
+
+class PersistentCache:
+    """Cache clé/valeur persistant (SQLite), partagé entre sessions et redémarrages."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        except (OSError, sqlite3.Error):
+            # Système de fichiers en lecture seule : on continue sans cache.
+            self._disabled = True
+        return self._conn
+
+    def _count(self, namespace: str, outcome: str) -> None:
+        counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get(self, namespace: str, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """Renvoie la valeur si elle existe et n'a pas expiré (ttl en secondes)."""
+        with self._lock:
+            conn = self._connection()
+            row = None
+            if conn is not None:
+                try:
+                    row = conn.execute(
+                        "SELECT value, stored_at FROM entries WHERE namespace = ? AND key = ?",
+                        (namespace, key),
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+            if row is None or (ttl is not None and time.time() - row[1] > ttl):
+                self._count(namespace, "misses")
+                return None
+            self._count(namespace, "hits")
+            return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (namespace, key, value, stored_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (namespace, key, payload, time.time()),
+                )
+                conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def replace(self, namespace: str, key: str, value: Any) -> None:
+        """Met à jour une entrée existante en conservant sa date d'enregistrement (son TTL)."""
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "UPDATE entries SET value = ? WHERE namespace = ? AND key = ?",
+                    (payload, namespace, key),
+                )
+                conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def incr(self, namespace: str, key: str, amount: int) -> int:
+        """Incrémente atomiquement un compteur entier et renvoie sa nouvelle valeur."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return 0
+            try:
+                conn.execute(
+                    "INSERT INTO entries (namespace, key, value, stored_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (namespace, key) DO UPDATE SET "
+                    "value = CAST(CAST(value AS INTEGER) + excluded.value AS TEXT), "
+                    "stored_at = excluded.stored_at",
+                    (namespace, key, str(amount), time.time()),
+                )
+                conn.commit()
+                row = conn.execute(
+                    "SELECT value FROM entries WHERE namespace = ? AND key = ?",
+                    (namespace, key),
+                ).fetchone()
+            except sqlite3.Error:
+                return 0
+            return int(row[0]) if row else 0
+
+    def evict(self, namespace: str, max_entries: int) -> None:
+        """Supprime les entrées les plus anciennes au-delà de max_entries."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM entries WHERE namespace = ? "
+                    "ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (namespace, namespace, max_entries),
+                )
+                conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+                conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Compteurs hits/misses par namespace depuis le démarrage du process."""
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self._stats.items()}
+
+
+_cache: Optional[PersistentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> PersistentCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PersistentCache(CACHE_DIR / "cache.sqlite3")
+        return _cache
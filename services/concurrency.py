@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+from services.ratelimit import BACKGROUND, current_priority, prepaid_token, prepaid_token_async
+from services.settings import env_int
+
+UPSTREAM_LIMITS: Dict[str, int] = {
+    "spotify": env_int("MDAI_SPOTIFY_CONCURRENCY", 6),
+    "youtube": env_int("MDAI_YOUTUBE_CONCURRENCY", 3),
+}
+
+_slots: Dict[str, threading.BoundedSemaphore] = {}
+# Sémaphores asynchrones, par boucle d'évènements : boucle -> {service: asyncio.Semaphore}.
+_async_slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Exécute chaque tâche dans une copie du contexte de l'appelant (span courant, locale...)."""
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
+
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Pool de threads borné, partagé par tout le process et identifié par son nom."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ContextThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"mdai-{name}")
+            _pools[name] = pool
+        return pool
+
+
+def priority_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Pool partagé du nom donné, ou son double réservé aux tâches d'arrière-plan.
+
+    Un préchauffage qui attend son débit n'occupe ainsi aucun worker des sessions.
+    """
+    if current_priority() == BACKGROUND:
+        name = f"{name}-background"
+    return get_pool(name, max_workers)
+
+
+@contextmanager
+def upstream_slot(upstream: str) -> Iterator[None]:
+    """Limite le nombre d'appels simultanés vers un même service externe.
+
+    Pour un service limité en débit, le jeton de la requête du bloc est pris avant
+    l'emplacement : on n'occupe pas un emplacement en attendant le débit.
+    """
+    with _pools_lock:
+        slot = _slots.get(upstream)
+        if slot is None:
+            slot = threading.BoundedSemaphore(UPSTREAM_LIMITS.get(upstream, 4))
+            _slots[upstream] = slot
+    with prepaid_token(upstream), slot:
+        yield
+
+
+@asynccontextmanager
+async def async_upstream_slot(upstream: str) -> AsyncIterator[None]:
+    """Équivalent asynchrone d'upstream_slot, avec les mêmes limites pour chaque boucle d'évènements."""
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        slots = _async_slots.setdefault(loop, {})
+        slot = slots.get(upstream)
+        if slot is None:
+            slot = asyncio.Semaphore(UPSTREAM_LIMITS.get(upstream, 4))
+            slots[upstream] = slot
+    async with prepaid_token_async(upstream), slot:
+        yield
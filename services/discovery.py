@@ -0,0 +1,119 @@
+from typing import Callable, Dict, Optional
+
+import spotipy
+
+from services.events import collect_events
+from services.openai_service import (
+    RecommendationVerifier,
+    create_analysis_prompt,
+    recommendation_cache_key,
+    stream_openai_recommendations,
+)
+from services.result_store import load_result, result_id, save_result
+from services.spotify_service import get_artist_data
+from services.tracing import span
+
+
+def run_discovery(
+    spotify: spotipy.Spotify,
+    artist_name: str,
+    openai_api_key: str,
+    *,
+    locale: str,
+    refresh: bool = False,
+    max_result_age: Optional[float] = None,
+    on_step: Optional[Callable[[int], None]] = None,
+    on_recommendation: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """Pipeline complet : profil Spotify, recommandations IA en streaming, vérification.
+
+    Renvoie {"status": "results" | "no_result", "artist_data", "recommendations", "result_id",
+    "events"} ; un résultat déjà présent dans le store partagé est réutilisé, sauf si
+    refresh=True ou s'il est plus ancien que max_result_age secondes. Aucune dépendance à
+    Streamlit : utilisable depuis un thread, un process ou une CLI.
+    """
+    show_step = on_step or (lambda step: None)
+
+    with collect_events() as events:
+        with span("discovery", locale=locale, refresh=refresh) as discovery_span:
+            result = _run_stages(
+                spotify,
+                artist_name,
+                openai_api_key,
+                locale,
+                refresh,
+                max_result_age,
+                show_step,
+                on_recommendation,
+            )
+            discovery_span.set(
+                outcome=result["status"],
+                recommendations=len(result["recommendations"].get("artists", [])),
+            )
+    result["events"] = events
+    return result
+
+
+def _run_stages(
+    spotify: spotipy.Spotify,
+    artist_name: str,
+    openai_api_key: str,
+    locale: str,
+    refresh: bool,
+    max_result_age: Optional[float],
+    show_step: Callable[[int], None],
+    on_recommendation: Optional[Callable[[Dict], None]],
+) -> Dict:
+    show_step(1)
+    with span("discovery.artist_data"):
+        artist_data = get_artist_data(spotify, artist_name)
+    if not artist_data:
+        return {"status": "no_result", "artist_data": None, "recommendations": {}}
+
+    if not refresh:
+        stored_id = result_id(artist_data.artist.id, locale)
+        stored = load_result(stored_id, max_result_age)
+        if stored:
+            return {
+                "status": "results",
+                "artist_data": stored["artist_data"],
+                "recommendations": stored["recommendations"],
+                "result_id": stored_id,
+            }
+
+    show_step(2)
+    analysis_prompt = create_analysis_prompt(artist_data, locale=locale)
+    verifier = RecommendationVerifier(spotify)
+    ia_response = {"analysis": "", "recommendations": []}
+    with span("discovery.recommendations") as recommendations_span:
+        ia_events = stream_openai_recommendations(
+            analysis_prompt,
+            openai_api_key,
+            cache_key=recommendation_cache_key(artist_data, locale),
+            refresh=refresh,
+        )
+        for kind, payload in ia_events:
+            if kind == "analysis":
+                ia_response["analysis"] = payload
+            elif payload.get("name"):
+                ia_response["recommendations"].append(payload)
+                verifier.submit(payload)
+                if on_recommendation:
+                    on_recommendation(payload)
+        recommendations_span.set(recommendations=len(ia_response["recommendations"]))
+    if not ia_response["recommendations"]:
+        return {"status": "no_result", "artist_data": artist_data, "recommendations": {}}
+
+    show_step(3)
+    with span("discovery.verification"):
+        enriched_recs = verifier.results()
+    if not enriched_recs:
+        return {"status": "no_result", "artist_data": artist_data, "recommendations": {}}
+
+    recommendations = {"analysis": ia_response["analysis"], "artists": enriched_recs}
+    return {
+        "status": "results",
+        "artist_data": artist_data,
+        "recommendations": recommendations,
+        "result_id": save_result(artist_data, recommendations, locale),
+    }
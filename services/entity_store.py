@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from services.name_resolver import normalize_name
+from services.records import Artist, Track, has_artist_fields
+from services.settings import DAY, env_float, env_int
+from services.typeahead import typeahead_index
+
+ENTITY_TTL = env_float("MDAI_ENTITY_TTL", DAY)
+ENTITY_MAX_ARTISTS = env_int("MDAI_ENTITY_MAX_ARTISTS", 20_000)
+ENTITY_MAX_TRACKS = env_int("MDAI_ENTITY_MAX_TRACKS", 50_000)
+
+
+class EntityStore:
+    """Artistes et morceaux Spotify déjà reçus par le process, sous forme compacte.
+
+    Indexés par identifiant Spotify (et, pour les artistes, par nom normalisé), bornés
+    en taille (LRU) et considérés périmés après ENTITY_TTL secondes. Chaque réponse
+    Spotify l'alimente ; les artistes sont aussi transmis à l'index des suggestions.
+    """
+
+    def __init__(self, max_artists: int, max_tracks: int, ttl: float):
+        self._max_artists = max_artists
+        self._max_tracks = max_tracks
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._artists: "OrderedDict[str, Tuple[float, Artist]]" = OrderedDict()
+        self._tracks: "OrderedDict[str, Track]" = OrderedDict()
+        self._top_tracks: Dict[str, Tuple[float, List[str]]] = {}
+        # Nom normalisé -> identifiants (homonymes compris).
+        self._names: Dict[str, Set[str]] = {}
+
+    def remember_artists(self, payloads: Iterable[Optional[Dict]]) -> None:
+        """Enregistre les objets artiste complets (recherche, /artists, artistes reliés…)."""
+        payloads = [payload for payload in payloads if payload and payload.get("id")]
+        typeahead_index.remember_artists(payloads)
+        now = time.time()
+        artists = [
+            Artist.from_spotify(payload) for payload in payloads if has_artist_fields(payload)
+        ]
+        with self._lock:
+            for artist in artists:
+                previous = self._artists.get(artist.id)
+                if previous is not None and previous[1].name != artist.name:
+                    self._unindex_name(artist.id, previous[1].name)
+                self._artists[artist.id] = (now, artist)
+                self._artists.move_to_end(artist.id)
+                self._names.setdefault(normalize_name(artist.name), set()).add(artist.id)
+            while len(self._artists) > self._max_artists:
+                artist_id, (_, evicted) = self._artists.popitem(last=False)
+                self._top_tracks.pop(artist_id, None)
+                self._unindex_name(artist_id, evicted.name)
+
+    def remember_top_tracks(self, artist_id: str, payloads: Iterable[Dict]) -> None:
+        tracks = [
+            Track.from_spotify(payload) for payload in payloads if payload and payload.get("id")
+        ]
+        with self._lock:
+            for track in tracks:
+                self._tracks[track.id] = track
+                self._tracks.move_to_end(track.id)
+            while len(self._tracks) > self._max_tracks:
+                self._tracks.popitem(last=False)
+            self._top_tracks[artist_id] = (time.time(), [track.id for track in tracks])
+
+    def artist(self, artist_id: str) -> Optional[Artist]:
+        with self._lock:
+            entry = self._artists.get(artist_id)
+            if entry is None or self._expired(entry[0]):
+                return None
+            self._artists.move_to_end(artist_id)
+            return entry[1]
+
+    def artist_by_name(self, name: str) -> Optional[Artist]:
+        """Artiste connu sous ce nom à la normalisation près, le plus populaire des homonymes.
+
+        Aucune correspondance approchée : un nom seulement proche d'un artiste connu
+        (Justice / Justine) est cherché sur Spotify, où les candidats sont départagés.
+        """
+        with self._lock:
+            ids = self._names.get(normalize_name(name), ())
+            entries = [self._artists[artist_id] for artist_id in ids]
+        fresh = [artist for stored_at, artist in entries if not self._expired(stored_at)]
+        return max(fresh, key=lambda artist: artist.popularity, default=None)
+
+    def top_tracks(self, artist_id: str) -> Optional[List[Track]]:
+        """Top tracks connues de l'artiste, ou None s'il faut interroger Spotify."""
+        with self._lock:
+            entry = self._top_tracks.get(artist_id)
+            if entry is None or self._expired(entry[0]):
+                return None
+            tracks = [self._tracks.get(track_id) for track_id in entry[1]]
+            if not all(tracks):
+                return None  # un morceau a été évincé entre-temps
+            return tracks
+
+    def _expired(self, stored_at: float) -> bool:
+        return time.time() - stored_at > self._ttl
+
+    def _unindex_name(self, artist_id: str, name: str) -> None:
+        key = normalize_name(name)
+        ids = self._names.get(key)
+        if ids is not None:
+            ids.discard(artist_id)
+            if not ids:
+                del self._names[key]
+
+
+entity_store = EntityStore(ENTITY_MAX_ARTISTS, ENTITY_MAX_TRACKS, ENTITY_TTL)
@@ -0,0 +1,68 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, Iterator, List, Optional
+
+from services.localization import translate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ServiceEvent:
+    """Information remontée par un service : une clé du catalogue i18n et ses paramètres.
+
+    La traduction est faite par l'appelant (interface, CLI), dans sa propre langue.
+    """
+
+    code: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    level: ClassVar[str] = "info"
+
+    def message(self, locale: Optional[str] = None) -> str:
+        return translate(self.code, locale, **self.params)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"level": self.level, "code": self.code, "params": dict(self.params)}
+
+
+@dataclass(frozen=True)
+class ServiceInfo(ServiceEvent):
+    level: ClassVar[str] = "info"
+
+
+@dataclass(frozen=True)
+class ServiceWarning(ServiceEvent):
+    level: ClassVar[str] = "warning"
+
+
+@dataclass(frozen=True)
+class ServiceError(ServiceEvent):
+    level: ClassVar[str] = "error"
+
+
+_collector: ContextVar[Optional[List[ServiceEvent]]] = ContextVar("event_collector", default=None)
+
+_LOG_LEVELS = {"info": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR}
+
+
+def emit(event: ServiceEvent) -> None:
+    """Transmet l'évènement au collecteur actif, ou le journalise s'il n'y en a pas."""
+    collector = _collector.get()
+    if collector is not None:
+        collector.append(event)
+        return
+    logger.log(_LOG_LEVELS.get(event.level, logging.INFO), "%s %s", event.code, event.params)
+
+
+@contextmanager
+def collect_events() -> Iterator[List[ServiceEvent]]:
+    """Collecte les évènements émis dans le contexte courant (et les pools qu'il alimente)."""
+    events: List[ServiceEvent] = []
+    token = _collector.set(events)
+    try:
+        yield events
+    finally:
+        _collector.reset(token)
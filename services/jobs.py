@@ -0,0 +1,98 @@
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import spotipy
+
+from services.concurrency import get_pool
+from services.discovery import run_discovery
+from services.events import ServiceEvent
+from services.settings import env_float, env_int
+
+DISCOVERY_JOB_WORKERS = env_int("MDAI_DISCOVERY_JOB_WORKERS", 4)
+DISCOVERY_JOB_RETENTION = env_float("MDAI_DISCOVERY_JOB_RETENTION", 900)
+
+
+@dataclass
+class DiscoveryJob:
+    job_id: str
+    artist_name: str
+    status: str = "pending"
+    step: int = 0
+    previews: List[Dict] = field(default_factory=list)
+    events: List[ServiceEvent] = field(default_factory=list)
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+_jobs: Dict[str, DiscoveryJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def _run_job(
+    job: DiscoveryJob,
+    spotify: spotipy.Spotify,
+    openai_api_key: str,
+    locale: str,
+    refresh: bool,
+) -> None:
+    job.status = "running"
+
+    def on_step(step: int) -> None:
+        job.step = step
+
+    try:
+        job.result = run_discovery(
+            spotify,
+            job.artist_name,
+            openai_api_key,
+            locale=locale,
+            refresh=refresh,
+            on_step=on_step,
+            on_recommendation=job.previews.append,
+        )
+        job.events = job.result["events"]
+        job.status = "done"
+    except Exception as e:
+        job.error = str(e)
+        job.status = "failed"
+    finally:
+        job.finished_at = time.time()
+
+
+def _prune_finished_jobs() -> None:
+    cutoff = time.time() - DISCOVERY_JOB_RETENTION
+    for job_id, job in list(_jobs.items()):
+        if job.finished_at is not None and job.finished_at < cutoff:
+            del _jobs[job_id]
+
+
+def submit_discovery_job(
+    spotify: spotipy.Spotify,
+    artist_name: str,
+    openai_api_key: str,
+    *,
+    locale: str,
+    refresh: bool = False,
+) -> str:
+    """Lance une découverte en arrière-plan et renvoie l'identifiant du job."""
+    job = DiscoveryJob(job_id=uuid.uuid4().hex, artist_name=artist_name)
+    with _jobs_lock:
+        _prune_finished_jobs()
+        _jobs[job.job_id] = job
+    get_pool("discovery", DISCOVERY_JOB_WORKERS).submit(
+        _run_job, job, spotify, openai_api_key, locale, refresh
+    )
+    return job.job_id
+
+
+def get_discovery_job(job_id: str) -> Optional[DiscoveryJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
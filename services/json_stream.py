@@ -0,0 +1,104 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+StreamEvent = Tuple[str, Any]
+
+
+class RecommendationStreamParser:
+    """Parse incrémentalement la réponse JSON de l'IA au fil des tokens reçus.
+
+    Émet ("analysis", texte) dès que l'analyse est complète, puis
+    ("recommendation", dict) pour chaque objet du tableau "recommendations"
+    dès que son accolade fermante arrive.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._root_start: Optional[int] = None
+        self._root_end: Optional[int] = None
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expecting_key = False
+        self._current_key: Optional[str] = None
+        self._in_recommendations = False
+        self._item_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        return self._root_end is not None
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        events: List[StreamEvent] = []
+        if self.done or not chunk:
+            return events
+        self._buffer += chunk
+
+        while self._pos < len(self._buffer) and not self.done:
+            char = self._buffer[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._on_string_end(events)
+            elif self._root_start is None:
+                if char == "{":
+                    self._root_start = self._pos
+                    self._depth = 1
+                    self._expecting_key = True
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in "{[":
+                if self._depth == 1 and char == "[":
+                    self._in_recommendations = self._current_key == "recommendations"
+                elif self._depth == 2 and char == "{" and self._in_recommendations:
+                    self._item_start = self._pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 2 and char == "}" and self._item_start is not None:
+                    self._emit_item(events)
+                elif self._depth == 1:
+                    self._in_recommendations = False
+                elif self._depth == 0:
+                    self._root_end = self._pos + 1
+            elif char == "," and self._depth == 1:
+                self._expecting_key = True
+            self._pos += 1
+
+        return events
+
+    def _on_string_end(self, events: List[StreamEvent]) -> None:
+        if self._depth != 1:
+            return
+        value = json.loads(self._buffer[self._string_start : self._pos + 1])
+        if self._expecting_key:
+            self._current_key = value
+            self._expecting_key = False
+        elif self._current_key == "analysis":
+            events.append(("analysis", value))
+
+    def _emit_item(self, events: List[StreamEvent]) -> None:
+        raw = self._buffer[self._item_start : self._pos + 1]
+        self._item_start = None
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        if isinstance(item, dict):
+            events.append(("recommendation", item))
+
+    def result(self) -> Optional[Any]:
+        """Document JSON complet, une fois le flux terminé."""
+        if self._root_start is None or self._root_end is None:
+            return None
+        try:
+            return json.loads(self._buffer[self._root_start : self._root_end])
+        except json.JSONDecodeError:
+            return None
@@ -0,0 +1,13 @@
+MESSAGES = {
+    "results.unspecified": "Unspecified",
+    "errors.spotify_connection": "Spotify connection error: {error}",
+    "errors.spotify_fetch": "Error fetching data: {error}",
+    "errors.spotify_related_info": "ℹ️ Related artists unavailable for this artist, but AI will still make recommendations!",
+    "errors.spotify_top_tracks_info": "ℹ️ Top tracks unavailable for this artist, but AI will still make recommendations!",
+    "errors.ai": "AI error: {error}",
+    "errors.artist_not_found": "Artist '{name}' not found on Spotify",
+    "errors.spotify_rate_limited": "Spotify is temporarily rate limiting requests: '{name}' could not be verified",
+    "errors.youtube_quota": "⚠️ YouTube API quota exceeded or invalid key",
+    "spotify.meta": "{followers} followers · {genre}",
+    "spotify.genre_fallback": "music",
+}
@@ -0,0 +1,13 @@
+MESSAGES = {
+    "results.unspecified": "Non spécifié",
+    "errors.spotify_connection": "Erreur de connexion Spotify : {error}",
+    "errors.spotify_fetch": "Erreur lors de la récupération des données : {error}",
+    "errors.spotify_related_info": "ℹ️ Artistes similaires indisponibles pour cet artiste, mais l'IA va quand même faire ses recommandations !",
+    "errors.spotify_top_tracks_info": "ℹ️ Top tracks indisponibles pour cet artiste, mais l'IA va quand même faire ses recommandations !",
+    "errors.ai": "Erreur IA : {error}",
+    "errors.artist_not_found": "Artiste '{name}' non trouvé sur Spotify",
+    "errors.spotify_rate_limited": "Spotify est momentanément saturé : '{name}' n'a pas pu être vérifié",
+    "errors.youtube_quota": "⚠️ Quota YouTube API dépassé ou clé invalide",
+    "spotify.meta": "{followers} abonnés · {genre}",
+    "spotify.genre_fallback": "musique",
+}
@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from services.locales import en as en_messages
+from services.locales import fr as fr_messages
+
+SUPPORTED_LOCALES = {"fr", "en"}
+DEFAULT_LOCALE = "fr"
+
+SIMILARITY_KEYS = (
+    "same_genre",
+    "historical_influence",
+    "creative_approach",
+    "surprise_discovery",
+)
+
+LEGACY_SIMILARITY_MAP: Dict[str, str] = {
+    "même genre": "same_genre",
+    "influence historique": "historical_influence",
+    "approche créative": "creative_approach",
+    "découverte surprenante": "surprise_discovery",
+    "same genre": "same_genre",
+    "historical influence": "historical_influence",
+    "creative approach": "creative_approach",
+    "surprise discovery": "surprise_discovery",
+}
+
+# Messages émis par les services (évènements, prompt, suggestions) ; les textes de
+# l'interface ont leur propre catalogue dans ui/i18n/locales.
+_CATALOGS: Dict[str, Dict[str, str]] = {
+    "fr": fr_messages.MESSAGES,
+    "en": en_messages.MESSAGES,
+}
+
+_locale_override: ContextVar[Optional[str]] = ContextVar("locale_override", default=None)
+
+
+@contextmanager
+def use_locale(locale: str) -> Iterator[None]:
+    """Fixe la langue du contexte courant (threads de travail sans session Streamlit)."""
+    token = _locale_override.set(locale)
+    try:
+        yield
+    finally:
+        _locale_override.reset(token)
+
+
+def locale_override() -> Optional[str]:
+    override = _locale_override.get()
+    return override if override in SUPPORTED_LOCALES else None
+
+
+def translate(key: str, locale: Optional[str] = None, **kwargs) -> str:
+    """Message du catalogue dans la langue demandée (sinon celle du contexte, sinon le français)."""
+    locale = locale or locale_override() or DEFAULT_LOCALE
+    message = _CATALOGS.get(locale, {}).get(key) or _CATALOGS[DEFAULT_LOCALE].get(key, key)
+    if kwargs:
+        return message.format(**kwargs)
+    return message
+
+
+def normalize_similarity_type(raw: Optional[str]) -> str:
+    if not raw:
+        return "same_genre"
+    value = str(raw).strip()
+    if value in SIMILARITY_KEYS:
+        return value
+    normalized = LEGACY_SIMILARITY_MAP.get(value.lower(), LEGACY_SIMILARITY_MAP.get(value))
+    if normalized:
+        return normalized
+    lower = value.lower()
+    for legacy, stable in LEGACY_SIMILARITY_MAP.items():
+        if legacy.lower() == lower:
+            return stable
+    return "same_genre"
@@ -0,0 +1,60 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Iterable, Optional
+
+from services.records import Artist
+from services.settings import env_float, env_int
+
+# Similarité minimale (0 à 1, noms normalisés) pour accepter un candidat de recherche Spotify.
+NAME_MATCH_THRESHOLD = env_float("MDAI_NAME_MATCH_THRESHOLD", 0.85)
+# Jusqu'à cette longueur (nom normalisé le plus court), seul un nom identique est accepté :
+# une lettre d'écart y suffit à désigner un autre artiste (Justice / Justine, Low / Lowe).
+NAME_EXACT_MAX_LENGTH = env_int("MDAI_NAME_EXACT_MAX_LENGTH", 8)
+# Candidats demandés à Spotify pour un nom inconnu localement.
+NAME_SEARCH_CANDIDATES = env_int("MDAI_NAME_SEARCH_CANDIDATES", 5)
+# Poids de la popularité (0 à 100) face à la similarité pour départager les candidats.
+POPULARITY_WEIGHT = 0.1
+
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_LEADING_ARTICLE = re.compile(r"^the\s+")
+
+
+def normalize_name(name: str) -> str:
+    """Nom comparable : casse, accents, ponctuation, espaces et « The » initial ignorés."""
+    text = unicodedata.normalize("NFKD", name.casefold().replace("&", " and "))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = " ".join(_PUNCTUATION.sub(" ", text).split())
+    # Un nom fait de ponctuation (« !!! ») reste comparable tel quel.
+    return _LEADING_ARTICLE.sub("", text) or text or " ".join(name.casefold().split())
+
+
+def name_similarity(normalized: str, name: str) -> float:
+    """Similarité entre un nom déjà normalisé et un nom d'artiste brut."""
+    other = normalize_name(name)
+    if normalized == other:
+        return 1.0
+    return SequenceMatcher(None, normalized, other).ratio()
+
+
+def pick_artist(name: str, candidates: Iterable[Artist]) -> Optional[Artist]:
+    """Meilleur candidat assez proche du nom, à similarité égale le plus populaire.
+
+    Un nom identique après normalisation l'emporte toujours sur un nom seulement proche,
+    quelle que soit la popularité de ce dernier. Un nom court n'est jamais approché.
+    """
+    normalized = normalize_name(name)
+    best, best_rank = None, None
+    for artist in candidates:
+        similarity = name_similarity(normalized, artist.name)
+        if similarity < 1.0 and not _may_approximate(normalized, artist.name, similarity):
+            continue
+        rank = (similarity == 1.0, similarity + POPULARITY_WEIGHT * artist.popularity / 100)
+        if best_rank is None or rank > best_rank:
+            best, best_rank = artist, rank
+    return best
+
+
+def _may_approximate(normalized: str, name: str, similarity: float) -> bool:
+    shortest = min(len(normalized), len(normalize_name(name)))
+    return shortest > NAME_EXACT_MAX_LENGTH and similarity >= NAME_MATCH_THRESHOLD
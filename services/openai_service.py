@@ -1,33 +1,84 @@
+import asyncio
+import hashlib
 import json
-from typing import Dict, List, Optional
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import openai
 import spotipy
-import streamlit as st
 
-from services.youtube_service import search_youtube_videos
-from ui.i18n import get_locale, normalize_similarity_type, t
+from services.cache import get_cache
+from services.concurrency import priority_pool, upstream_slot
+from services.entity_store import entity_store
+from services.events import ServiceError, ServiceWarning, emit
+from services.json_stream import RecommendationStreamParser, StreamEvent
+from services.localization import (
+    DEFAULT_LOCALE,
+    locale_override,
+    normalize_similarity_type,
+    translate,
+)
+from services.name_resolver import NAME_SEARCH_CANDIDATES, normalize_name, pick_artist
+from services.ratelimit import is_rate_limited
+from services.records import (
+    Artist,
+    ArtistProfile,
+    SpotifyMatch,
+    Track,
+    has_artist_fields,
+    required_fields,
+)
+from services.settings import DAY, env_float, env_int
+from services.singleflight import SingleFlight
+from services.tracing import finish_span, span, start_span
+from services.spotify_service import AsyncSpotify
+from services.transport import get_async_client, get_httpx_client
 
 SIMILARITY_TYPE_ENUM = "same_genre|historical_influence|creative_approach|surprise_discovery"
 
+OPENAI_MODEL = "gpt-4o-mini"
+OPENAI_MAX_TOKENS = 1000
+OPENAI_TEMPERATURE = 0.7
 
-def create_analysis_prompt(artist_data: Dict, locale: Optional[str] = None) -> str:
+# À incrémenter à chaque modification du gabarit de create_analysis_prompt.
+PROMPT_VERSION = 1
+LLM_CACHE_TTL = env_float("MDAI_LLM_CACHE_TTL", 7 * DAY)
+LLM_CACHE_MAX_ENTRIES = env_int("MDAI_LLM_CACHE_MAX_ENTRIES", 5000)
+
+VERIFY_WORKERS = env_int("MDAI_VERIFY_WORKERS", 16)
+SPOTIFY_ARTISTS_BATCH = 50
+# Une recommandation vérifiée alimente sa carte et sa fiche détail.
+VERIFIED_FIELDS = required_fields("detail_view")
+
+_openai_clients: Dict[str, openai.OpenAI] = {}
+_openai_clients_lock = threading.Lock()
+# Clients asynchrones, par boucle d'évènements : boucle -> {empreinte de clé: client}.
+_async_openai_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+_completion_flights = SingleFlight("openai.completion")
+_verification_flights = SingleFlight("spotify.verify")
+
+
+def create_analysis_prompt(artist_data: ArtistProfile, locale: Optional[str] = None) -> str:
     """Crée le prompt pour l'analyse IA dans la langue active."""
-    active_locale = locale or get_locale()
-    artist_info = artist_data["info"]
-    unspecified = t("results.unspecified")
-    genres = ", ".join(artist_data["genres"]) if artist_data["genres"] else unspecified
-    top_tracks = [track["name"] for track in artist_data["top_tracks"][:5]]
-    related_artists = [artist["name"] for artist in artist_data["related_artists"][:5]]
+    active_locale = locale or locale_override() or DEFAULT_LOCALE
+    artist = artist_data.artist
+    unspecified = translate("results.unspecified", active_locale)
+    genres = ", ".join(artist.genres) if artist.genres else unspecified
+    top_tracks = [track.name for track in artist_data.top_tracks[:5]]
+    related_artists = [related.name for related in artist_data.related_artists[:5]]
 
     if active_locale == "en":
         return f"""You are a music discovery expert. Analyze this artist and recommend 8 similar but lesser-known artists.
 
 ARTIST TO ANALYZE:
-- Name: {artist_info['name']}
+- Name: {artist.name}
 - Genres: {genres}
-- Popularity: {artist_data['popularity']}/100
-- Followers: {artist_data['followers']:,}
+- Popularity: {artist.popularity}/100
+- Followers: {artist.followers:,}
 - Top tracks: {', '.join(top_tracks)}
 - Spotify related artists: {', '.join(related_artists)}
 
@@ -59,10 +110,10 @@ IMPORTANT:
     return f"""Tu es un expert en découverte musicale. Analyse cet artiste et recommande 8 artistes similaires mais moins connus.
 
 ARTISTE À ANALYSER:
-- Nom: {artist_info['name']}
+- Nom: {artist.name}
 - Genres: {genres}
-- Popularité: {artist_data['popularity']}/100
-- Followers: {artist_data['followers']:,}
+- Popularité: {artist.popularity}/100
+- Followers: {artist.followers:,}
 - Top tracks: {', '.join(top_tracks)}
 - Artistes reliés Spotify: {', '.join(related_artists)}
 
@@ -92,73 +143,496 @@ IMPORTANT:
 - Utilise uniquement les valeurs similarity_type listées ci-dessus."""
 
 
-def call_openai_for_recommendations(prompt: str, api_key: str) -> Optional[Dict]:
-    """Appelle OpenAI pour les recommandations."""
+def get_openai_client(api_key: str) -> openai.OpenAI:
+    """Client OpenAI partagé par clé API, sur le transport HTTP commun du process."""
+    key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _openai_clients_lock:
+        client = _openai_clients.get(key)
+        if client is None:
+            client = openai.OpenAI(api_key=api_key, http_client=get_httpx_client("openai"))
+            _openai_clients[key] = client
+        return client
+
+
+def get_async_openai_client(api_key: str) -> openai.AsyncOpenAI:
+    """Client OpenAI asynchrone partagé par clé API dans la boucle d'évènements courante."""
+    key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _openai_clients_lock:
+        clients = _async_openai_clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(key)
+        if client is None:
+            client = openai.AsyncOpenAI(api_key=api_key, http_client=get_async_client("openai"))
+            clients[key] = client
+        return client
+
+
+def recommendation_cache_key(artist_data: ArtistProfile, locale: str) -> str:
+    """Empreinte des entrées du prompt, de la langue, du modèle et de la version du gabarit."""
+    payload = {
+        "name": artist_data.artist.name,
+        "genres": artist_data.artist.genres,
+        "popularity": artist_data.artist.popularity,
+        "followers": artist_data.artist.followers,
+        "top_tracks": [track.name for track in artist_data.top_tracks[:5]],
+        "related_artists": [related.name for related in artist_data.related_artists[:5]],
+        "locale": locale,
+        "model": OPENAI_MODEL,
+        "prompt_version": PROMPT_VERSION,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _cached_response(cache_key: Optional[str], refresh: bool) -> Optional[Dict]:
+    if not cache_key or refresh:
+        return None
+    return get_cache().get("llm_response", cache_key, LLM_CACHE_TTL)
+
+
+def _store_response(cache_key: Optional[str], response: Dict) -> None:
+    if not cache_key or not isinstance(response, dict) or not response.get("recommendations"):
+        return
+    cache = get_cache()
+    cache.set("llm_response", cache_key, response)
+    cache.evict("llm_response", LLM_CACHE_MAX_ENTRIES)
+
+
+def _completion_key(prompt: str, api_key: str, cache_key: Optional[str], refresh: bool) -> Tuple:
+    """Requêtes identiques : même prompt (ou même empreinte de cache), même clé d'API."""
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    prompt_key = cache_key or hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return prompt_key, key_hash, refresh
+
+
+def call_openai_for_recommendations(
+    prompt: str,
+    api_key: str,
+    *,
+    cache_key: Optional[str] = None,
+    refresh: bool = False,
+) -> Optional[Dict]:
+    """Appelle OpenAI pour les recommandations (refresh=True ignore le cache)."""
+    cached = _cached_response(cache_key, refresh)
+    if cached:
+        return cached
+    return _completion_flights.do(
+        _completion_key(prompt, api_key, cache_key, refresh),
+        _request_recommendations,
+        prompt,
+        api_key,
+        cache_key,
+    )
+
+
+def _request_recommendations(prompt: str, api_key: str, cache_key: Optional[str]) -> Optional[Dict]:
+    try:
+        client = get_openai_client(api_key)
+        with span("openai:chat.completions", model=OPENAI_MODEL, stream=False) as current:
+            response = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=OPENAI_MAX_TOKENS,
+                temperature=OPENAI_TEMPERATURE,
+            )
+            if response.usage:
+                current.set(
+                    prompt_tokens=response.usage.prompt_tokens,
+                    completion_tokens=response.usage.completion_tokens,
+                )
+
+        parsed = _parse_response_text(response.choices[0].message.content)
+        _store_response(cache_key, parsed)
+        return parsed
+    except Exception as e:
+        emit(ServiceError("errors.ai", {"error": str(e)}))
+        return None
+
+
+async def call_openai_for_recommendations_async(
+    prompt: str,
+    api_key: str,
+    *,
+    cache_key: Optional[str] = None,
+    refresh: bool = False,
+) -> Optional[Dict]:
+    """Variante asynchrone de call_openai_for_recommendations (même cache de réponses)."""
+    cached = await asyncio.to_thread(_cached_response, cache_key, refresh)
+    if cached:
+        return cached
+    return await _completion_flights.do_async(
+        _completion_key(prompt, api_key, cache_key, refresh),
+        _request_recommendations_async,
+        prompt,
+        api_key,
+        cache_key,
+    )
+
+
+async def _request_recommendations_async(
+    prompt: str, api_key: str, cache_key: Optional[str]
+) -> Optional[Dict]:
+    try:
+        client = get_async_openai_client(api_key)
+        with span("openai:chat.completions", model=OPENAI_MODEL, stream=False) as current:
+            response = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=OPENAI_MAX_TOKENS,
+                temperature=OPENAI_TEMPERATURE,
+            )
+            if response.usage:
+                current.set(
+                    prompt_tokens=response.usage.prompt_tokens,
+                    completion_tokens=response.usage.completion_tokens,
+                )
+
+        parsed = _parse_response_text(response.choices[0].message.content)
+        await asyncio.to_thread(_store_response, cache_key, parsed)
+        return parsed
+    except Exception as e:
+        emit(ServiceError("errors.ai", {"error": str(e)}))
+        return None
+
+
+def _parse_response_text(response_text: str) -> Dict:
+    if "```json" in response_text:
+        response_text = response_text.split("```json")[1].split("```")[0]
+    elif "```" in response_text:
+        response_text = response_text.split("```")[1].split("```")[0]
+    return json.loads(response_text.strip())
+
+
+def stream_openai_recommendations(
+    prompt: str,
+    api_key: str,
+    *,
+    cache_key: Optional[str] = None,
+    refresh: bool = False,
+) -> Iterator[StreamEvent]:
+    """Appelle OpenAI en streaming et émet l'analyse puis chaque recommandation dès qu'elle est complète."""
+    cached = _cached_response(cache_key, refresh)
+    if cached:
+        yield "analysis", cached.get("analysis", "")
+        for rec in cached["recommendations"]:
+            yield "recommendation", rec
+        return
+
+    # Un appel identique déjà en cours est suivi au lieu d'être relancé.
+    yield from _completion_flights.stream(
+        _completion_key(prompt, api_key, cache_key, refresh),
+        lambda: _stream_completion(prompt, api_key, cache_key),
+    )
+
+
+def _stream_completion(
+    prompt: str, api_key: str, cache_key: Optional[str]
+) -> Iterator[StreamEvent]:
+    # Le span couvre tout le flux, jusqu'au dernier fragment reçu.
+    completion_span = start_span("openai:chat.completions", model=OPENAI_MODEL, stream=True)
+    error: Optional[Exception] = None
     try:
-        client = openai.OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        client = get_openai_client(api_key)
+        stream = client.chat.completions.create(
+            model=OPENAI_MODEL,
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=1000,
-            temperature=0.7,
+            max_tokens=OPENAI_MAX_TOKENS,
+            temperature=OPENAI_TEMPERATURE,
+            stream=True,
+            stream_options={"include_usage": True},
         )
 
-        response_text = response.choices[0].message.content
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0]
-
-        return json.loads(response_text.strip())
+        parser = RecommendationStreamParser()
+        received = 0
+        received_bytes = 0
+        for chunk in stream:
+            if chunk.usage:
+                completion_span.set(
+                    prompt_tokens=chunk.usage.prompt_tokens,
+                    completion_tokens=chunk.usage.completion_tokens,
+                )
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content or ""
+            received_bytes += len(content.encode("utf-8"))
+            for event in parser.feed(content):
+                if event[0] == "recommendation" and not received:
+                    completion_span.set(
+                        first_recommendation_ms=round(
+                            (time.time() - completion_span.start) * 1000, 3
+                        )
+                    )
+                received += event[0] == "recommendation"
+                yield event
+        completion_span.set(bytes=received_bytes, recommendations=received)
+        if not received:
+            raise ValueError("no recommendation found in the AI response")
+        if parser.done:
+            _store_response(cache_key, parser.result() or {})
     except Exception as e:
-        st.error(t("errors.ai", error=str(e)))
+        error = e
+        emit(ServiceError("errors.ai", {"error": str(e)}))
+    finally:
+        finish_span(completion_span, error)
+
+
+def _verification_key(rec: Dict) -> str:
+    return normalize_name(rec["name"])
+
+
+def _resolve_recommendation(spotify: spotipy.Spotify, rec: Dict) -> Optional[Dict]:
+    return _verification_flights.do(_verification_key(rec), _search_recommendation, spotify, rec)
+
+
+def _search_recommendation(spotify: spotipy.Spotify, rec: Dict) -> Optional[Dict]:
+    artist = entity_store.artist_by_name(rec["name"])
+    complete = True
+    if artist is None:
+        with upstream_slot("spotify"):
+            results = spotify.search(
+                q=rec["name"], type="artist", limit=NAME_SEARCH_CANDIDATES
+            )
+        match = _pick_search_hit(rec["name"], results["artists"]["items"])
+        if match is None:
+            return None
+        artist, complete = match
+
+    top_tracks = _known_top_tracks(artist.id)
+    if top_tracks is None:
+        with upstream_slot("spotify"):
+            payloads = spotify.artist_top_tracks(artist.id, country="FR")["tracks"]
+        top_tracks = _remember_top_tracks(artist.id, payloads)
+    return {"artist": artist, "top_tracks": top_tracks, "complete": complete}
+
+
+def _pick_search_hit(name: str, items: List[Dict]) -> Optional[Tuple[Artist, bool]]:
+    """Candidat de recherche retenu pour le nom, et s'il est complet sans passer par /artists.
+
+    Aucun candidat assez proche : la recommandation est écartée plutôt que rattachée
+    au premier résultat venu.
+    """
+    entity_store.remember_artists(items)
+    payloads = {item["id"]: item for item in items if item and item.get("id")}
+    artist = pick_artist(name, (Artist.from_spotify(item) for item in payloads.values()))
+    if artist is None:
         return None
+    return artist, has_artist_fields(payloads[artist.id])
+
+
+def _known_top_tracks(artist_id: str) -> Optional[List[Track]]:
+    """Top tracks déjà connues, une liste vide si la fiche n'en affiche pas, sinon None."""
+    if "top_tracks" not in VERIFIED_FIELDS:
+        return []
+    return entity_store.top_tracks(artist_id)
+
+
+def _remember_top_tracks(artist_id: str, payloads: List[Dict]) -> List[Track]:
+    entity_store.remember_top_tracks(artist_id, payloads)
+    return [Track.from_spotify(payload) for payload in payloads]
+
+
+def _fetch_artists_metadata(
+    spotify: spotipy.Spotify, artist_ids: List[str]
+) -> Dict[str, Artist]:
+    known, missing = _split_known_artists(artist_ids)
+    payloads: Dict[str, Dict] = {}
+    for start in range(0, len(missing), SPOTIFY_ARTISTS_BATCH):
+        batch_ids = tuple(missing[start : start + SPOTIFY_ARTISTS_BATCH])
+        try:
+            batch = _verification_flights.do(batch_ids, _fetch_artists_batch, spotify, batch_ids)
+        except Exception:
+            continue
+        for artist in batch.get("artists", []):
+            if artist:
+                payloads[artist["id"]] = artist
+    return {**known, **_remember_artist_payloads(payloads)}
+
+
+def _split_known_artists(artist_ids: List[str]) -> Tuple[Dict[str, Artist], List[str]]:
+    """Artistes encore frais dans le magasin d'entités, et identifiants à demander à /artists."""
+    known: Dict[str, Artist] = {}
+    for artist_id in artist_ids:
+        artist = entity_store.artist(artist_id)
+        if artist is not None:
+            known[artist_id] = artist
+    return known, [artist_id for artist_id in artist_ids if artist_id not in known]
+
+
+def _remember_artist_payloads(payloads: Dict[str, Dict]) -> Dict[str, Artist]:
+    entity_store.remember_artists(payloads.values())
+    return {artist_id: Artist.from_spotify(payload) for artist_id, payload in payloads.items()}
+
+
+def _fetch_artists_batch(spotify: spotipy.Spotify, artist_ids: Tuple[str, ...]) -> Dict:
+    with upstream_slot("spotify"):
+        return spotify.artists(list(artist_ids))
+
+
+def _lookup_failure(rec: Dict, error: BaseException) -> ServiceWarning:
+    """Un artiste non vérifié faute de débit Spotify n'est pas signalé comme introuvable."""
+    if is_rate_limited(error):
+        return ServiceWarning("errors.spotify_rate_limited", {"name": rec.get("name", "")})
+    return ServiceWarning("errors.artist_not_found", {"name": rec.get("name", "")})
+
+
+class RecommendationVerifier:
+    """Vérification au fil de l'eau : chaque recommandation soumise est enrichie immédiatement."""
+
+    def __init__(self, spotify: spotipy.Spotify):
+        self._spotify = spotify
+        self._pool = priority_pool("verify", VERIFY_WORKERS)
+        self._submitted: List[Tuple[Dict, Future]] = []
+
+    def submit(self, rec: Dict) -> None:
+        future = self._pool.submit(_resolve_recommendation, self._spotify, rec)
+        self._submitted.append((rec, future))
+
+    def results(self) -> List[Dict]:
+        """Attend la fin des vérifications et renvoie les recommandations enrichies, dans l'ordre."""
+        recommendations = [rec for rec, _ in self._submitted]
+        resolved: List[Optional[Dict]] = []
+        for rec, future in self._submitted:
+            try:
+                resolved.append(future.result())
+            except Exception as e:
+                emit(_lookup_failure(rec, e))
+                resolved.append(None)
+
+        return _build_enriched_recommendations(self._spotify, recommendations, resolved)
 
 
 def verify_and_enrich_recommendations(
     spotify: spotipy.Spotify,
     recommendations: List[Dict],
-    youtube_api_key: str = "",
 ) -> List[Dict]:
-    """Vérifie que les artistes existent sur Spotify et enrichit les données."""
-    enriched_recs = []
+    """Vérifie que les artistes existent sur Spotify et enrichit les données.
 
+    La vidéo YouTube n'est pas résolue ici : voir resolve_recommendation_video.
+    """
+    verifier = RecommendationVerifier(spotify)
     for rec in recommendations:
-        try:
-            results = spotify.search(q=rec["name"], type="artist", limit=1)
-            if results["artists"]["items"]:
-                artist = results["artists"]["items"][0]
-                top_tracks = spotify.artist_top_tracks(artist["id"], country="FR")
-
-                youtube_url = None
-                if youtube_api_key and top_tracks["tracks"]:
-                    top_track = top_tracks["tracks"][0]
-                    youtube_url = search_youtube_videos(
-                        artist["name"],
-                        top_track["name"],
-                        youtube_api_key,
-                    )
+        verifier.submit(rec)
+    return verifier.results()
+
+
+async def _resolve_recommendation_async(spotify: AsyncSpotify, rec: Dict) -> Optional[Dict]:
+    return await _verification_flights.do_async(
+        _verification_key(rec), _search_recommendation_async, spotify, rec
+    )
+
+
+async def _search_recommendation_async(spotify: AsyncSpotify, rec: Dict) -> Optional[Dict]:
+    # Index local et magasin d'entités prennent un verrou de threads : hors de la boucle.
+    artist = await asyncio.to_thread(entity_store.artist_by_name, rec["name"])
+    complete = True
+    if artist is None:
+        items = await spotify.search_artist(rec["name"], limit=NAME_SEARCH_CANDIDATES)
+        match = await asyncio.to_thread(_pick_search_hit, rec["name"], items)
+        if match is None:
+            return None
+        artist, complete = match
 
-                enriched_rec = {
-                    "name": artist["name"],
-                    "reason": rec["reason"],
-                    "similarity_type": normalize_similarity_type(rec.get("similarity_type")),
-                    "confidence": rec["confidence"],
-                    "spotify_data": {
-                        "id": artist["id"],
-                        "image": artist["images"][0]["url"] if artist["images"] else None,
-                        "genres": artist["genres"],
-                        "popularity": artist["popularity"],
-                        "followers": artist["followers"]["total"],
-                        "top_tracks": top_tracks["tracks"][:3],
-                        "external_urls": artist["external_urls"],
-                        "youtube_url": youtube_url,
-                    },
-                }
-                enriched_recs.append(enriched_rec)
+    top_tracks = await asyncio.to_thread(_known_top_tracks, artist.id)
+    if top_tracks is None:
+        payloads = await spotify.artist_top_tracks(artist.id, country="FR")
+        top_tracks = await asyncio.to_thread(_remember_top_tracks, artist.id, payloads)
+    return {"artist": artist, "top_tracks": top_tracks, "complete": complete}
+
+
+async def _fetch_artists_metadata_async(
+    spotify: AsyncSpotify, artist_ids: List[str]
+) -> Dict[str, Artist]:
+    known, missing = await asyncio.to_thread(_split_known_artists, artist_ids)
+    batches = [
+        tuple(missing[start : start + SPOTIFY_ARTISTS_BATCH])
+        for start in range(0, len(missing), SPOTIFY_ARTISTS_BATCH)
+    ]
+    outcomes = await asyncio.gather(
+        *(
+            _verification_flights.do_async(batch, _fetch_artists_batch_async, spotify, batch)
+            for batch in batches
+        ),
+        return_exceptions=True,
+    )
+    payloads: Dict[str, Dict] = {}
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            continue
+        for artist in outcome:
+            if artist:
+                payloads[artist["id"]] = artist
+    return {**known, **await asyncio.to_thread(_remember_artist_payloads, payloads)}
+
+
+async def _fetch_artists_batch_async(
+    spotify: AsyncSpotify, artist_ids: Tuple[str, ...]
+) -> List[Dict]:
+    return await spotify.artists(list(artist_ids))
+
+
+async def verify_and_enrich_recommendations_async(
+    spotify: AsyncSpotify,
+    recommendations: List[Dict],
+) -> List[Dict]:
+    """Variante asynchrone de verify_and_enrich_recommendations : une tâche par recommandation."""
+    outcomes = await asyncio.gather(
+        *(_resolve_recommendation_async(spotify, rec) for rec in recommendations),
+        return_exceptions=True,
+    )
+    resolved: List[Optional[Dict]] = []
+    for rec, outcome in zip(recommendations, outcomes):
+        if isinstance(outcome, BaseException):
+            emit(_lookup_failure(rec, outcome))
+            resolved.append(None)
+        else:
+            resolved.append(outcome)
+
+    metadata = await _fetch_artists_metadata_async(spotify, _incomplete_artist_ids(resolved))
+    return _merge_enriched_recommendations(recommendations, resolved, metadata)
+
+
+def _build_enriched_recommendations(
+    spotify: spotipy.Spotify,
+    recommendations: List[Dict],
+    resolved: List[Optional[Dict]],
+) -> List[Dict]:
+    metadata = _fetch_artists_metadata(spotify, _incomplete_artist_ids(resolved))
+    return _merge_enriched_recommendations(recommendations, resolved, metadata)
+
+
+def _incomplete_artist_ids(resolved: List[Optional[Dict]]) -> List[str]:
+    """Artistes dont le résultat de recherche ne suffit pas : eux seuls passent par /artists."""
+    return list(
+        dict.fromkeys(
+            item["artist"].id for item in resolved if item and not item["complete"]
+        )
+    )
+
+
+def _merge_enriched_recommendations(
+    recommendations: List[Dict],
+    resolved: List[Optional[Dict]],
+    metadata: Dict[str, Artist],
+) -> List[Dict]:
+    enriched_recs = []
+    for rec, item in zip(recommendations, resolved):
+        if not item:
+            continue
+        try:
+            artist = metadata.get(item["artist"].id, item["artist"])
+            enriched_rec = {
+                "name": artist.name,
+                "reason": rec["reason"],
+                "similarity_type": normalize_similarity_type(rec.get("similarity_type")),
+                "confidence": rec["confidence"],
+                "spotify_data": SpotifyMatch(
+                    artist=artist,
+                    top_tracks=item["top_tracks"][:3],
+                ),
+            }
+            enriched_recs.append(enriched_rec)
 
         except Exception:
-            st.warning(t("errors.artist_not_found", name=rec.get("name", "")))
+            emit(ServiceWarning("errors.artist_not_found", {"name": rec.get("name", "")}))
             continue
 
     return enriched_recs
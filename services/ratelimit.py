@@ -0,0 +1,270 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Iterator, Optional, Union
+
+from services.settings import env_float
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Au-delà de ce Retry-After, la requête échoue au lieu d'attendre (le seau reste en pause).
+RATE_LIMIT_MAX_WAIT = env_float("MDAI_RATE_LIMIT_MAX_WAIT", 30.0)
+RATE_LIMIT_RETRIES = 3
+
+# Débit soutenu (requêtes/s) et rafale par service ; Spotify ne publie pas de chiffre exact.
+UPSTREAM_RATE_LIMITS: Dict[str, Dict[str, float]] = {
+    "spotify": {
+        "rate": env_float("MDAI_SPOTIFY_RATE", 10.0),
+        "burst": env_float("MDAI_SPOTIFY_BURST", 20.0),
+        "background_share": env_float("MDAI_SPOTIFY_BACKGROUND_SHARE", 0.5),
+    },
+}
+
+class SharedPriority:
+    """Priorité d'un appel partagé (single-flight), relevée par un appelant interactif.
+
+    Un appel lancé par le préchauffage passe ainsi en interactif dès qu'une session l'attend.
+    """
+
+    __slots__ = ("priority",)
+
+    def __init__(self, priority: str):
+        self.priority = priority
+
+    def join(self, priority: str) -> None:
+        if priority == INTERACTIVE and self.priority != INTERACTIVE:
+            self.priority = INTERACTIVE
+            # Les requêtes de l'appel qui attendent déjà leur jeton réévaluent leur priorité.
+            for limiter in list(_limiters.values()):
+                limiter.wake()
+
+
+_priority: ContextVar[Union[str, SharedPriority]] = ContextVar(
+    "request_priority", default=INTERACTIVE
+)
+
+
+@contextmanager
+def request_priority(priority: Union[str, SharedPriority]) -> Iterator[None]:
+    """Priorité des appels sortants du contexte courant (hérité par les pools de threads)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    priority = _priority.get()
+    return priority.priority if isinstance(priority, SharedPriority) else priority
+
+
+class RateLimited(Exception):
+    """Service en pause pour plus de RATE_LIMIT_MAX_WAIT secondes : on n'attend pas."""
+
+    # Même attribut que SpotifyException : is_rate_limited le reconnaît comme un 429.
+    http_status = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited for {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Seau à jetons partagé par tout le process, avec pause sur Retry-After.
+
+    Les requêtes d'arrière-plan ne prennent un jeton que si le seau reste au-dessus
+    de la part réservée aux requêtes interactives et qu'aucune d'elles n'attend.
+    """
+
+    def __init__(self, rate: float, burst: float, background_share: float):
+        self._rate = max(rate, 0.1)
+        self._burst = max(burst, 1.0)
+        self._background_floor = self._burst * (1 - min(max(background_share, 0.0), 1.0))
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._interactive_waiting = 0
+        self._cond = threading.Condition()
+
+    def _try_take(self, priority: str) -> float:
+        """Prend un jeton et renvoie 0, ou renvoie le délai avant de réessayer."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+        floor = 0.0
+        if priority == BACKGROUND:
+            if self._interactive_waiting:
+                return 1 / self._rate
+            floor = self._background_floor
+        if self._tokens - 1 >= floor:
+            self._tokens -= 1
+            return 0.0
+        return (floor + 1 - self._tokens) / self._rate
+
+    def _check_pause(self) -> None:
+        """Lève RateLimited si la pause restante dépasse ce qu'un appelant accepte d'attendre."""
+        remaining = self._paused_until - time.monotonic()
+        if remaining > RATE_LIMIT_MAX_WAIT:
+            raise RateLimited(remaining)
+
+    def _wait_as(self, priority: Optional[str], previous: Optional[str]) -> Optional[str]:
+        """Tient le compte des attentes interactives quand la priorité d'un appelant change."""
+        if priority != previous:
+            if previous is not None and previous != BACKGROUND:
+                self._interactive_waiting -= 1
+            if priority is not None and priority != BACKGROUND:
+                self._interactive_waiting += 1
+        return priority
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def acquire(self, priority: Optional[str] = None) -> float:
+        """Bloque jusqu'à obtenir un jeton ; renvoie le temps passé en file (secondes).
+
+        Lève RateLimited au lieu d'attendre la fin d'une pause plus longue que
+        RATE_LIMIT_MAX_WAIT.
+        """
+        started = time.monotonic()
+        waiting_as = None
+        with self._cond:
+            try:
+                while True:
+                    self._check_pause()
+                    # Relue à chaque tour : un appel partagé peut devenir interactif en route.
+                    waiting_as = self._wait_as(priority or current_priority(), waiting_as)
+                    wait = self._try_take(waiting_as)
+                    if wait <= 0:
+                        return time.monotonic() - started
+                    self._cond.wait(wait)
+            finally:
+                self._wait_as(None, waiting_as)
+
+    async def acquire_async(self, priority: Optional[str] = None) -> float:
+        started = time.monotonic()
+        waiting_as = None
+        try:
+            while True:
+                with self._cond:
+                    self._check_pause()
+                    waiting_as = self._wait_as(priority or current_priority(), waiting_as)
+                    wait = self._try_take(waiting_as)
+                if wait <= 0:
+                    return time.monotonic() - started
+                await asyncio.sleep(wait)
+        finally:
+            with self._cond:
+                self._wait_as(None, waiting_as)
+
+    def pause(self, seconds: float) -> None:
+        """Suspend toutes les requêtes vers ce service (réponse 429 avec Retry-After)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._cond.notify_all()
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(upstream: str) -> Optional[RateLimiter]:
+    """Limiteur partagé du service, ou None s'il n'est pas limité."""
+    settings = UPSTREAM_RATE_LIMITS.get(upstream)
+    if settings is None:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(upstream)
+        if limiter is None:
+            limiter = RateLimiter(**settings)
+            _limiters[upstream] = limiter
+        return limiter
+
+
+# Jetons pris d'avance par upstream_slot pour la requête du bloc : service -> attente (s).
+_prepaid: ContextVar[Optional[Dict[str, float]]] = ContextVar("prepaid_tokens", default=None)
+
+
+@contextmanager
+def prepaid_token(upstream: str) -> Iterator[None]:
+    """Prend le jeton avant l'emplacement de concurrence, jamais en l'occupant.
+
+    Sans cela, une requête d'arrière-plan en attente de débit bloquerait un emplacement
+    et les requêtes interactives resteraient derrière le sémaphore, invisibles du seau.
+    """
+    limiter = get_rate_limiter(upstream)
+    if limiter is None:
+        yield
+        return
+    queued = limiter.acquire()
+    token = _prepaid.set({**(_prepaid.get() or {}), upstream: queued})
+    try:
+        yield
+    finally:
+        _prepaid.reset(token)
+
+
+@asynccontextmanager
+async def prepaid_token_async(upstream: str) -> AsyncIterator[None]:
+    limiter = get_rate_limiter(upstream)
+    if limiter is None:
+        yield
+        return
+    queued = await limiter.acquire_async()
+    token = _prepaid.set({**(_prepaid.get() or {}), upstream: queued})
+    try:
+        yield
+    finally:
+        _prepaid.reset(token)
+
+
+def _take_prepaid(upstream: str) -> Optional[float]:
+    prepaid = _prepaid.get()
+    return prepaid.pop(upstream, None) if prepaid else None
+
+
+def take_token(upstream: str, limiter: RateLimiter) -> float:
+    """Jeton d'une requête : celui payé d'avance par le bloc courant, sinon un nouveau."""
+    queued = _take_prepaid(upstream)
+    return limiter.acquire() if queued is None else queued
+
+
+async def take_token_async(upstream: str, limiter: RateLimiter) -> float:
+    queued = _take_prepaid(upstream)
+    return await limiter.acquire_async() if queued is None else queued
+
+
+def retry_after_seconds(headers, default: float = 1.0) -> float:
+    """Délai de Retry-After, en secondes ou en date HTTP ; default s'il est absent ou illisible."""
+    value = (headers.get("Retry-After") or "").strip()
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Vrai pour un 429 remonté par spotipy (SpotifyException) ou httpx (HTTPStatusError)."""
+    status = getattr(error, "http_status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
@@ -0,0 +1,143 @@
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional
+
+
+# Projections des objets Spotify gardés en session : seuls les champs lus par le prompt
+# et l'interface sont conservés, les réponses brutes restent dans le cache persistant.
+
+# Groupes de champs lus par chaque consommateur : le chargement n'appelle que les endpoints
+# qu'ils exigent. "artist" vient du résultat de recherche (ou, à défaut, du profil).
+FIELD_REQUIREMENTS: Dict[str, FrozenSet[str]] = {
+    "prompt": frozenset({"artist", "top_tracks", "related_artists"}),
+    "profile_header": frozenset({"artist"}),
+    "detail_view": frozenset({"artist", "top_tracks"}),
+}
+
+# Clés d'un objet artiste Spotify lues par Artist.from_spotify.
+ARTIST_PAYLOAD_KEYS = frozenset(
+    {"id", "name", "genres", "popularity", "followers", "images", "external_urls"}
+)
+
+
+def required_fields(*consumers: str) -> FrozenSet[str]:
+    """Union des groupes de champs demandés par les consommateurs cités."""
+    return frozenset().union(*(FIELD_REQUIREMENTS[consumer] for consumer in consumers))
+
+
+def has_artist_fields(payload: Dict[str, Any]) -> bool:
+    """Vrai si l'objet artiste (résultat de recherche…) suffit sans appel à /artists."""
+    return ARTIST_PAYLOAD_KEYS <= payload.keys()
+
+
+@dataclass(slots=True)
+class Track:
+    id: str
+    name: str
+    album: str = ""
+    spotify_url: str = ""
+
+    @classmethod
+    def from_spotify(cls, payload: Dict[str, Any]) -> "Track":
+        return cls(
+            id=payload.get("id") or "",
+            name=payload.get("name") or "",
+            album=(payload.get("album") or {}).get("name") or "",
+            spotify_url=(payload.get("external_urls") or {}).get("spotify") or "",
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Track":
+        return cls(**data)
+
+
+@dataclass(slots=True)
+class Artist:
+    id: str
+    name: str
+    genres: List[str] = field(default_factory=list)
+    popularity: int = 0
+    followers: int = 0
+    image: Optional[str] = None
+    spotify_url: str = ""
+
+    @classmethod
+    def from_spotify(cls, payload: Dict[str, Any]) -> "Artist":
+        images = payload.get("images") or []
+        return cls(
+            id=payload["id"],
+            name=payload.get("name") or "",
+            genres=list(payload.get("genres") or []),
+            popularity=payload.get("popularity") or 0,
+            followers=(payload.get("followers") or {}).get("total") or 0,
+            image=images[0]["url"] if images else None,
+            spotify_url=(payload.get("external_urls") or {}).get("spotify") or "",
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Artist":
+        return cls(**data)
+
+
+@dataclass(slots=True)
+class ArtistProfile:
+    """Artiste de départ d'une découverte : profil, top tracks et artistes reliés."""
+
+    artist: Artist
+    top_tracks: List[Track] = field(default_factory=list)
+    related_artists: List[Artist] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ArtistProfile":
+        return cls(
+            artist=Artist.from_dict(data["artist"]),
+            top_tracks=[Track.from_dict(track) for track in data.get("top_tracks", [])],
+            related_artists=[
+                Artist.from_dict(artist) for artist in data.get("related_artists", [])
+            ],
+        )
+
+
+@dataclass(slots=True)
+class SpotifyMatch:
+    """Artiste Spotify retenu pour une recommandation, et sa vidéo une fois résolue."""
+
+    artist: Artist
+    top_tracks: List[Track] = field(default_factory=list)
+    youtube_url: Optional[str] = None
+    youtube_resolved: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpotifyMatch":
+        return cls(
+            artist=Artist.from_dict(data["artist"]),
+            top_tracks=[Track.from_dict(track) for track in data.get("top_tracks", [])],
+            youtube_url=data.get("youtube_url"),
+            youtube_resolved=bool(data.get("youtube_resolved")),
+        )
+
+
+def recommendations_to_dict(recommendations: Dict[str, Any]) -> Dict[str, Any]:
+    """{"analysis", "artists"} sérialisable en JSON (store partagé, sortie JSONL)."""
+    return {
+        "analysis": recommendations.get("analysis", ""),
+        "artists": [
+            dict(rec, spotify_data=rec["spotify_data"].to_dict())
+            for rec in recommendations.get("artists", [])
+        ],
+    }
+
+
+def recommendations_from_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "analysis": data.get("analysis", ""),
+        "artists": [
+            dict(rec, spotify_data=SpotifyMatch.from_dict(rec["spotify_data"]))
+            for rec in data.get("artists", [])
+        ],
+    }
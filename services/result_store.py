@@ -0,0 +1,122 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from services.cache import get_cache
+from services.openai_service import PROMPT_VERSION
+from services.records import (
+    ArtistProfile,
+    recommendations_from_dict,
+    recommendations_to_dict,
+)
+from services.settings import DAY, env_float, env_int
+
+RESULT_STORE_TTL = env_float("MDAI_RESULT_TTL", 7 * DAY)
+RESULT_STORE_MAX_ENTRIES = env_int("MDAI_RESULT_MAX_ENTRIES", 2000)
+# Version du format enregistré : un résultat d'un autre format est recalculé.
+RESULT_FORMAT = 2
+
+# Nombre de résultats dont on retient les vidéos déjà enregistrées (évite une relecture).
+KNOWN_VIDEOS_MAX_RESULTS = 1024
+
+_write_lock = threading.Lock()
+# Identifiant de résultat -> noms des recommandations dont la vidéo est déjà dans le store.
+_known_videos: "OrderedDict[str, Set[str]]" = OrderedDict()
+
+
+def result_id(artist_id: str, locale: str) -> str:
+    """Identifiant stable d'un résultat : artiste de départ, langue et version du prompt."""
+    payload = f"{artist_id}:{locale}:{PROMPT_VERSION}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def save_result(artist_data: ArtistProfile, recommendations: Dict, locale: str) -> str:
+    """Enregistre une découverte terminée dans le store partagé et renvoie son identifiant."""
+    rid = result_id(artist_data.artist.id, locale)
+    cache = get_cache()
+    with _write_lock:
+        cache.set(
+            "discovery_result",
+            rid,
+            {
+                "format": RESULT_FORMAT,
+                "locale": locale,
+                "artist_data": artist_data.to_dict(),
+                "recommendations": recommendations_to_dict(recommendations),
+            },
+        )
+        # Un résultat régénéré remplace l'ancien : ses vidéos déjà connues aussi.
+        _remember_videos(rid, _resolved_names(recommendations.get("artists", [])), replace=True)
+    cache.evict("discovery_result", RESULT_STORE_MAX_ENTRIES)
+    return rid
+
+
+def load_result(rid: str, max_age: Optional[float] = None) -> Optional[Dict]:
+    """Renvoie {"locale", "artist_data", "recommendations"} ou None si absent ou plus vieux que max_age."""
+    if not rid:
+        return None
+    ttl = RESULT_STORE_TTL if max_age is None else min(max_age, RESULT_STORE_TTL)
+    stored = get_cache().get("discovery_result", rid, ttl)
+    if not stored or stored.get("format") != RESULT_FORMAT:
+        return None
+    recommendations = recommendations_from_dict(stored["recommendations"])
+    with _write_lock:
+        _remember_videos(rid, _resolved_names(recommendations["artists"]), replace=True)
+    return {
+        "locale": stored["locale"],
+        "artist_data": ArtistProfile.from_dict(stored["artist_data"]),
+        "recommendations": recommendations,
+    }
+
+
+def _resolved_names(recommendations: List[Dict]) -> Set[str]:
+    return {
+        rec["name"]
+        for rec in recommendations
+        if rec.get("spotify_data") and rec["spotify_data"].youtube_resolved
+    }
+
+
+def _remember_videos(rid: str, names: Set[str], replace: bool = False) -> None:
+    """À appeler sous _write_lock ; replace quand names décrit tout le résultat enregistré."""
+    if replace:
+        _known_videos[rid] = set(names)
+    else:
+        _known_videos.setdefault(rid, set()).update(names)
+    _known_videos.move_to_end(rid)
+    while len(_known_videos) > KNOWN_VIDEOS_MAX_RESULTS:
+        _known_videos.popitem(last=False)
+
+
+def store_resolved_videos(rid: str, recommendations: List[Dict]) -> None:
+    """Reporte dans le store les vidéos YouTube résolues depuis l'enregistrement du résultat.
+
+    La date d'enregistrement est conservée : un report ne prolonge pas la durée de vie du
+    résultat partagé. Rien n'est relu si toutes les vidéos sont déjà connues du store.
+    """
+    resolved = {
+        rec["name"]: rec["spotify_data"].youtube_url
+        for rec in recommendations
+        if rec.get("spotify_data") and rec["spotify_data"].youtube_resolved
+    }
+    if not rid or not resolved:
+        return
+
+    cache = get_cache()
+    with _write_lock:
+        if resolved.keys() <= _known_videos.get(rid, set()):
+            return
+        stored = cache.get("discovery_result", rid)
+        if not stored:
+            return
+        changed = False
+        for rec in stored["recommendations"].get("artists", []):
+            spotify_data = rec.get("spotify_data") or {}
+            if rec.get("name") in resolved and not spotify_data.get("youtube_resolved"):
+                spotify_data["youtube_url"] = resolved[rec["name"]]
+                spotify_data["youtube_resolved"] = True
+                changed = True
+        if changed:
+            cache.replace("discovery_result", rid, stored)
+        _remember_videos(rid, set(resolved))
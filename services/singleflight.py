@@ -0,0 +1,209 @@
+import asyncio
+import contextvars
+import copy
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from services.events import ServiceEvent, collect_events, emit
+from services.ratelimit import SharedPriority, current_priority, request_priority
+from services.tracing import finish_span, span, start_span
+
+_DONE = object()
+
+
+class _Flight:
+    """Appel en cours : résultat (ou erreur), évènements émis et priorité partagée."""
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.events: List[ServiceEvent] = []
+        self.priority = SharedPriority(current_priority())
+
+
+class _StreamFlight:
+    """Flux en cours : éléments déjà produits, partagés avec les abonnés arrivés en route."""
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.events: List[ServiceEvent] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.cond = threading.Condition()
+        self.priority = SharedPriority(current_priority())
+
+
+class StreamAborted(Exception):
+    """Le premier appelant a abandonné un flux partagé : ses abonnés n'en ont qu'une partie."""
+
+
+def _replay(events: List[ServiceEvent]) -> None:
+    for event in events:
+        emit(event)
+
+
+class SingleFlight:
+    """Regroupe les appels identiques simultanés : un seul part vers le service externe.
+
+    Le premier appelant d'une clé exécute la fonction ; ceux qui arrivent pendant
+    l'exécution attendent et reçoivent une copie du même résultat (ou la même erreur),
+    ainsi que les évènements émis par l'appel. Rien n'est conservé une fois l'appel terminé :
+    la mise en cache reste l'affaire des services.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Flight] = {}
+        self._streams: Dict[Hashable, _StreamFlight] = {}
+        # Les futurs asyncio sont liés à leur boucle :
+        # boucle -> {clé: (futur, évènements, priorité)}.
+        self._async_calls: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            flight = self._calls.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._calls[key] = _Flight()
+
+        if not leader:
+            flight.priority.join(current_priority())
+            with span(f"singleflight:{self.name}"):
+                try:
+                    return copy.deepcopy(flight.future.result())
+                finally:
+                    _replay(flight.events)
+
+        # L'appel suit la priorité la plus haute de ses appelants, pas seulement celle du premier.
+        with collect_events() as events, request_priority(flight.priority):
+            try:
+                result, error = fn(*args, **kwargs), None
+            except BaseException as e:
+                result, error = None, e
+        # Les évènements sont en place avant que le résultat ne réveille les autres appelants.
+        flight.events = list(events)
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            flight.future.set_exception(error)
+        else:
+            flight.future.set_result(result)
+        _replay(flight.events)
+        if error is not None:
+            raise error
+        return result
+
+    async def do_async(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Variante asynchrone de do, limitée aux tâches de la boucle d'évènements courante."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._async_calls.setdefault(loop, {})
+            flight: Optional[Tuple[asyncio.Future, List[ServiceEvent], SharedPriority]]
+            flight = calls.get(key)
+            leader = flight is None
+            if leader:
+                flight = calls[key] = (
+                    loop.create_future(), [], SharedPriority(current_priority())
+                )
+        future, flight_events, priority = flight
+
+        if not leader:
+            priority.join(current_priority())
+            with span(f"singleflight:{self.name}"):
+                try:
+                    return copy.deepcopy(await asyncio.shield(future))
+                finally:
+                    _replay(flight_events)
+
+        with collect_events() as events, request_priority(priority):
+            try:
+                result, error = await fn(*args, **kwargs), None
+            except BaseException as e:
+                result, error = None, e
+        flight_events.extend(events)
+        with self._lock:
+            del calls[key]
+        if error is not None:
+            future.set_exception(error)
+            # L'erreur est relancée ici : inutile de la signaler aussi comme non récupérée.
+            future.exception()
+        else:
+            future.set_result(result)
+        _replay(flight_events)
+        if error is not None:
+            raise error
+        return result
+
+    def stream(self, key: Hashable, factory: Callable[[], Iterator[Any]]) -> Iterator[Any]:
+        """Flux partagé : un abonné rejoue les éléments déjà produits puis suit le flux.
+
+        Si le premier appelant abandonne le flux en route, ses abonnés reçoivent StreamAborted.
+        """
+        with self._lock:
+            flight = self._streams.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._streams[key] = _StreamFlight()
+
+        if leader:
+            yield from self._lead_stream(key, flight, factory)
+        else:
+            yield from self._follow_stream(flight)
+
+    def _lead_stream(
+        self, key: Hashable, flight: _StreamFlight, factory: Callable[[], Iterator[Any]]
+    ) -> Iterator[Any]:
+        # Le générateur s'exécute dans un contexte dédié : ses évènements y sont collectés
+        # sans intercepter ceux que l'appelant émet entre deux éléments.
+        with collect_events() as events, request_priority(flight.priority):
+            context = contextvars.copy_context()
+        iterator = context.run(factory)
+        try:
+            while True:
+                item = context.run(next, iterator, _DONE)
+                if item is _DONE:
+                    break
+                with flight.cond:
+                    flight.items.append(item)
+                    flight.cond.notify_all()
+                yield item
+        except BaseException as e:
+            # Flux fermé par son lecteur (GeneratorExit…) : les abonnés ne doivent pas prendre
+            # la liste tronquée pour un résultat complet.
+            flight.error = e if isinstance(e, Exception) else StreamAborted(self.name)
+            raise
+        finally:
+            context.run(iterator.close)
+            with self._lock:
+                del self._streams[key]
+            with flight.cond:
+                flight.events = list(events)
+                flight.done = True
+                flight.cond.notify_all()
+            _replay(flight.events)
+
+    def _follow_stream(self, flight: _StreamFlight) -> Iterator[Any]:
+        flight.priority.join(current_priority())
+        follow_span = start_span(f"singleflight:{self.name}")
+        try:
+            position = 0
+            while True:
+                with flight.cond:
+                    while position >= len(flight.items) and not flight.done:
+                        flight.cond.wait()
+                    items = flight.items[position:]
+                    finished = flight.done
+                position += len(items)
+                for item in items:
+                    yield copy.deepcopy(item)
+                if finished:
+                    break
+        finally:
+            finish_span(follow_span)
+        _replay(flight.events)
+        if isinstance(flight.error, Exception):
+            raise flight.error
@@ -1,28 +1,129 @@
-from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import threading
+import weakref
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
 
 import spotipy
-import streamlit as st
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
 
-from ui.i18n import t
+from services.cache import get_cache
+from services.concurrency import async_upstream_slot, priority_pool
+from services.entity_store import entity_store
+from services.events import ServiceError, ServiceInfo, emit
+from services.localization import translate
+from services.ratelimit import is_rate_limited
+from services.records import Artist, ArtistProfile, Track, has_artist_fields, required_fields
+from services.settings import DAY, env_float, env_int
+from services.singleflight import SingleFlight
+from services.transport import BorrowedSession, async_request, request_timeout
+from services.typeahead import typeahead_index
+
+# Durée de vie (secondes) de chaque groupe de champs du cache artiste.
+ARTIST_CACHE_TTLS: Dict[str, float] = {
+    "alias": env_float("MDAI_ARTIST_TTL_ALIAS", 7 * DAY),
+    "info": env_float("MDAI_ARTIST_TTL_INFO", DAY),
+    "top_tracks": env_float("MDAI_ARTIST_TTL_TOP_TRACKS", DAY),
+    "related_artists": env_float("MDAI_ARTIST_TTL_RELATED", 7 * DAY),
+}
+
+ARTIST_FETCH_WORKERS = env_int("MDAI_ARTIST_FETCH_WORKERS", 8)
+
+# Le jeton est renouvelé dès qu'il lui reste moins de TOKEN_REFRESH_MARGIN secondes.
+TOKEN_REFRESH_MARGIN = 300
+
+SPOTIFY_API_URL = "https://api.spotify.com/v1"
+SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+
+@dataclass
+class _PooledSpotifyClient:
+    client: spotipy.Spotify
+    auth_manager: SpotifyClientCredentials
+    refresh_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_spotify_clients: Dict[str, _PooledSpotifyClient] = {}
+# Un verrou par jeu d'identifiants : un échange de jeton lent ne bloque que ses propres sessions.
+_client_creation_locks: Dict[str, threading.Lock] = {}
+_spotify_clients_lock = threading.Lock()
+
+# Données publiques du catalogue : les sessions qui cherchent le même artiste partagent l'appel.
+_artist_data_flights = SingleFlight("spotify.artist_data")
+
+# Ce qu'affiche une découverte : le prompt et l'en-tête de profil de la page de résultats.
+DISCOVERY_FIELDS = required_fields("prompt", "profile_header")
+
+
+def _credentials_key(client_id: str, client_secret: str) -> str:
+    return hashlib.sha256(f"{client_id}:{client_secret}".encode("utf-8")).hexdigest()
+
+
+def _refresh_token_if_needed(pooled: _PooledSpotifyClient) -> None:
+    token = pooled.auth_manager.cache_handler.get_cached_token()
+    if token and token.get("expires_at", 0) - time.time() > TOKEN_REFRESH_MARGIN:
+        return
+    with pooled.refresh_lock:
+        token = pooled.auth_manager.cache_handler.get_cached_token()
+        if not token or token.get("expires_at", 0) - time.time() <= TOKEN_REFRESH_MARGIN:
+            pooled.auth_manager.get_access_token(as_dict=False, check_cache=False)
+
+
+def get_spotify_client(
+    client_id: str, client_secret: str, *, revalidate: bool = False
+) -> spotipy.Spotify:
+    """Client Spotify partagé par tout le process pour un jeu d'identifiants donné."""
+    key = _credentials_key(client_id, client_secret)
+    with _spotify_clients_lock:
+        pooled = None if revalidate else _spotify_clients.get(key)
+        creation_lock = _client_creation_locks.setdefault(key, threading.Lock())
+    if pooled is None:
+        with creation_lock:
+            with _spotify_clients_lock:
+                pooled = None if revalidate else _spotify_clients.get(key)
+            if pooled is None:
+                pooled = _create_spotify_client(client_id, client_secret)
+                with _spotify_clients_lock:
+                    _spotify_clients[key] = pooled
+
+    _refresh_token_if_needed(pooled)
+    return pooled.client
+
+
+def _create_spotify_client(client_id: str, client_secret: str) -> _PooledSpotifyClient:
+    # spotipy ferme la session reçue à sa destruction (client remplacé par revalidate) :
+    # il n'obtient qu'une BorrowedSession, le pool keep-alive partagé reste ouvert.
+    auth_manager = SpotifyClientCredentials(
+        client_id=client_id,
+        client_secret=client_secret,
+        cache_handler=MemoryCacheHandler(),
+        requests_session=BorrowedSession("spotify-accounts"),
+        requests_timeout=request_timeout(),
+    )
+    # L'obtention du premier jeton suffit à valider les identifiants.
+    auth_manager.get_access_token(as_dict=False)
+    return _PooledSpotifyClient(
+        client=spotipy.Spotify(
+            auth_manager=auth_manager,
+            requests_session=BorrowedSession("spotify"),
+            requests_timeout=request_timeout(),
+        ),
+        auth_manager=auth_manager,
+    )
 
 
 def initialize_spotify(
-    client_id: str, client_secret: str, *, silent: bool = False
+    client_id: str, client_secret: str, *, silent: bool = False, revalidate: bool = False
 ) -> Optional[spotipy.Spotify]:
     """Initialise le client Spotify. Si silent=True, pas de message d'erreur (init automatique)."""
     try:
-        from spotipy.oauth2 import SpotifyClientCredentials
-
-        client_credentials_manager = SpotifyClientCredentials(
-            client_id=client_id,
-            client_secret=client_secret,
-        )
-        spotify = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
-        spotify.search(q="test", type="artist", limit=1)
-        return spotify
+        return get_spotify_client(client_id, client_secret, revalidate=revalidate)
     except Exception as e:
         if not silent:
-            st.error(t("errors.spotify_connection", error=str(e)))
+            emit(ServiceError("errors.spotify_connection", {"error": str(e)}))
         return None
 
 
@@ -35,24 +136,31 @@ def format_followers(count: int) -> str:
 
 
 def search_artist_suggestions(
-    spotify: spotipy.Spotify, query: str, limit: int = 5
+    spotify: spotipy.Spotify, query: str, limit: int = 5, locale: Optional[str] = None
 ) -> List[Dict]:
-    """Recherche des suggestions d'artistes pour l'autocomplete."""
+    """Recherche des suggestions d'artistes pour l'autocomplete (Spotify seulement pour un préfixe inédit)."""
     if not query or len(query.strip()) < 2:
         return []
 
     try:
-        results = spotify.search(q=query.strip(), type="artist", limit=limit)
+        artists = typeahead_index.lookup(query, limit)
+        if artists is None:
+            results = spotify.search(q=query.strip(), type="artist", limit=limit)
+            items = results.get("artists", {}).get("items", [])
+            typeahead_index.remember_query(query, limit, items)
+            entity_store.remember_artists(items)
+            artists = typeahead_index.lookup(query, limit) or []
+
         suggestions = []
-        for artist in results.get("artists", {}).get("items", []):
+        for artist in artists:
             genres = artist.get("genres", [])
-            genre_label = genres[0] if genres else t("spotify.genre_fallback")
-            followers = format_followers(artist["followers"]["total"])
+            genre_label = genres[0] if genres else translate("spotify.genre_fallback", locale)
+            followers = format_followers(artist["followers"])
             suggestions.append(
                 {
                     "name": artist["name"],
                     "initial": artist["name"][0].upper() if artist["name"] else "?",
-                    "meta": t("spotify.meta", followers=followers, genre=genre_label),
+                    "meta": translate("spotify.meta", locale, followers=followers, genre=genre_label),
                     "popularity": artist.get("popularity", 0),
                     "hot": artist.get("popularity", 0) >= 70,
                 }
@@ -62,36 +170,307 @@ def search_artist_suggestions(
         return []
 
 
-def get_artist_data(spotify: spotipy.Spotify, artist_name: str) -> Optional[Dict]:
-    """Récupère les données d'un artiste depuis Spotify."""
+def _normalize_query(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+def _cached_alias(artist_name: str) -> Optional[str]:
+    alias = _normalize_query(artist_name)
+    return get_cache().get("artist_alias", alias, ARTIST_CACHE_TTLS["alias"])
+
+
+def _remember_search_hit(
+    artist_name: str, items: List[Dict]
+) -> Tuple[Optional[str], Optional[Dict]]:
+    """Mémorise l'alias et, s'il est complet, l'objet artiste renvoyé par la recherche."""
+    if not items:
+        return None, None
+    artist = items[0]
+    cache = get_cache()
+    cache.set("artist_alias", _normalize_query(artist_name), artist["id"])
+    if not has_artist_fields(artist):
+        return artist["id"], None
+    cache.set("artist_info", artist["id"], artist)
+    return artist["id"], artist
+
+
+def _resolve_artist(
+    spotify: spotipy.Spotify, artist_name: str
+) -> Tuple[Optional[str], Optional[Dict]]:
+    """Identifiant de l'artiste, et son objet complet quand il vient d'une recherche."""
+    artist_id = _cached_alias(artist_name)
+    if artist_id:
+        return artist_id, None
+    results = spotify.search(q=artist_name, type="artist", limit=1)
+    return _remember_search_hit(artist_name, results["artists"]["items"])
+
+
+def _cached_artist_field(group: str, artist_id: str, fetch: Callable[[], Any]) -> Any:
+    cache = get_cache()
+    namespace = f"artist_{group}"
+    value = cache.get(namespace, artist_id, ARTIST_CACHE_TTLS[group])
+    if value is None:
+        value = fetch()
+        cache.set(namespace, artist_id, value)
+    return value
+
+
+def artist_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Compteurs hits/misses du cache artiste (alias et groupes de champs)."""
+    return {
+        namespace: counters
+        for namespace, counters in get_cache().stats().items()
+        if namespace.startswith("artist_")
+    }
+
+
+def get_artist_data(
+    spotify: spotipy.Spotify, artist_name: str, fields: FrozenSet[str] = DISCOVERY_FIELDS
+) -> Optional[ArtistProfile]:
+    """Récupère les données d'un artiste depuis Spotify (via le cache persistant).
+
+    Seuls les groupes de champs demandés (voir records.FIELD_REQUIREMENTS) sont chargés ;
+    les autres restent vides.
+    """
+    return _artist_data_flights.do(
+        (_normalize_query(artist_name), fields), _fetch_artist_data, spotify, artist_name, fields
+    )
+
+
+def _field_fetchers(spotify: spotipy.Spotify, artist_id: str) -> Dict[str, Callable[[], Any]]:
+    return {
+        "top_tracks": lambda: spotify.artist_top_tracks(artist_id, country="FR")["tracks"],
+        "related_artists": lambda: spotify.artist_related_artists(artist_id)["artists"][:10],
+    }
+
+
+def _fetch_artist_data(
+    spotify: spotipy.Spotify, artist_name: str, fields: FrozenSet[str]
+) -> Optional[ArtistProfile]:
+    try:
+        artist_id, search_hit = _resolve_artist(spotify, artist_name)
+        if not artist_id:
+            return None
+
+        pool = priority_pool("spotify-artist", ARTIST_FETCH_WORKERS)
+        futures = {
+            group: pool.submit(_cached_artist_field, group, artist_id, fetch)
+            for group, fetch in _field_fetchers(spotify, artist_id).items()
+            if group in fields
+        }
+        # Profil déjà reçu (recherche, ou artiste encore frais dans le magasin d'entités) :
+        # pas d'appel à /artists/{id}.
+        artist_info = (
+            search_hit
+            or entity_store.artist(artist_id)
+            or _cached_artist_field("info", artist_id, lambda: spotify.artist(artist_id))
+        )
+
+        values: Dict[str, List[Dict]] = {}
+        for group, future in futures.items():
+            try:
+                values[group] = future.result()
+            except Exception:
+                values[group] = []
+                _report_missing_field(group)
+        return _assemble_artist_data(artist_info, values)
+    except Exception as e:
+        emit(_fetch_failure(artist_name, e))
+        return None
+
+
+def _fetch_failure(artist_name: str, error: BaseException) -> ServiceError:
+    if is_rate_limited(error):
+        return ServiceError("errors.spotify_rate_limited", {"name": artist_name})
+    return ServiceError("errors.spotify_fetch", {"error": str(error)})
+
+
+def _report_missing_field(group: str) -> None:
+    if group == "related_artists":
+        emit(ServiceInfo("errors.spotify_related_info"))
+    elif group == "top_tracks":
+        emit(ServiceInfo("errors.spotify_top_tracks_info"))
+
+
+def _assemble_artist_data(
+    artist_info: Union[Dict, Artist], values: Dict[str, List[Dict]]
+) -> ArtistProfile:
+    """artist_info : objet artiste Spotify, ou Artist déjà connu du magasin d'entités."""
+    related_artists = values.get("related_artists", [])
+    if isinstance(artist_info, Artist):
+        artist = artist_info
+        entity_store.remember_artists(related_artists)
+    else:
+        artist = Artist.from_spotify(artist_info)
+        entity_store.remember_artists([artist_info, *related_artists])
+    if "top_tracks" in values:
+        entity_store.remember_top_tracks(artist.id, values["top_tracks"])
+    return ArtistProfile(
+        artist=artist,
+        top_tracks=[Track.from_spotify(track) for track in values.get("top_tracks", [])],
+        related_artists=[Artist.from_spotify(artist) for artist in related_artists],
+    )
+
+
+class AsyncSpotify:
+    """Client Spotify (client credentials) sur httpx.AsyncClient, pour les variantes asynchrones.
+
+    Seuls les endpoints utilisés par l'application sont couverts ; les réponses ont
+    la même forme JSON que celles de spotipy.
+    """
+
+    def __init__(self, client_id: str, client_secret: str):
+        self._credentials = (client_id, client_secret)
+        self._token: Optional[Dict[str, Any]] = None
+        # asyncio.Lock est lié à une boucle : un verrou par boucle d'évènements.
+        self._token_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _token_valid(self) -> bool:
+        return bool(self._token and self._token["expires_at"] - time.time() > TOKEN_REFRESH_MARGIN)
+
+    async def _access_token(self) -> str:
+        if not self._token_valid():
+            lock = self._token_locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+            async with lock:
+                if not self._token_valid():
+                    response = await async_request(
+                        "spotify-accounts",
+                        "POST",
+                        SPOTIFY_TOKEN_URL,
+                        data={"grant_type": "client_credentials"},
+                        auth=self._credentials,
+                    )
+                    response.raise_for_status()
+                    payload = response.json()
+                    self._token = {
+                        "access_token": payload["access_token"],
+                        "expires_at": time.time() + payload["expires_in"],
+                    }
+        return self._token["access_token"]
+
+    async def get(self, path: str, **params: Any) -> Dict:
+        token = await self._access_token()
+        async with async_upstream_slot("spotify"):
+            response = await async_request(
+                "spotify",
+                "GET",
+                f"{SPOTIFY_API_URL}{path}",
+                params=params,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        response.raise_for_status()
+        return response.json()
+
+    async def search_artist(self, name: str, limit: int = 1) -> List[Dict]:
+        results = await self.get("/search", q=name, type="artist", limit=limit)
+        return results["artists"]["items"]
+
+    async def artist(self, artist_id: str) -> Dict:
+        return await self.get(f"/artists/{artist_id}")
+
+    async def artists(self, artist_ids: List[str]) -> List[Dict]:
+        results = await self.get("/artists", ids=",".join(artist_ids))
+        return results["artists"]
+
+    async def artist_top_tracks(self, artist_id: str, country: str = "FR") -> List[Dict]:
+        results = await self.get(f"/artists/{artist_id}/top-tracks", country=country)
+        return results["tracks"]
+
+    async def artist_related_artists(self, artist_id: str) -> List[Dict]:
+        results = await self.get(f"/artists/{artist_id}/related-artists")
+        return results["artists"]
+
+
+_async_spotify_clients: Dict[str, AsyncSpotify] = {}
+
+
+def get_async_spotify_client(client_id: str, client_secret: str) -> AsyncSpotify:
+    """Client Spotify asynchrone partagé par tout le process pour un jeu d'identifiants donné."""
+    key = _credentials_key(client_id, client_secret)
+    with _spotify_clients_lock:
+        client = _async_spotify_clients.get(key)
+        if client is None:
+            client = AsyncSpotify(client_id, client_secret)
+            _async_spotify_clients[key] = client
+        return client
+
+
+async def _resolve_artist_async(
+    spotify: AsyncSpotify, artist_name: str
+) -> Tuple[Optional[str], Optional[Dict]]:
+    artist_id = await asyncio.to_thread(_cached_alias, artist_name)
+    if artist_id:
+        return artist_id, None
+    items = await spotify.search_artist(artist_name, limit=1)
+    return await asyncio.to_thread(_remember_search_hit, artist_name, items)
+
+
+async def _cached_artist_field_async(
+    group: str, artist_id: str, fetch: Callable[[], Awaitable[Any]]
+) -> Any:
+    # SQLite est bloquant : lectures et écritures du cache passent par un thread.
+    cache = get_cache()
+    namespace = f"artist_{group}"
+    value = await asyncio.to_thread(cache.get, namespace, artist_id, ARTIST_CACHE_TTLS[group])
+    if value is None:
+        value = await fetch()
+        await asyncio.to_thread(cache.set, namespace, artist_id, value)
+    return value
+
+
+async def get_artist_data_async(
+    spotify: AsyncSpotify, artist_name: str, fields: FrozenSet[str] = DISCOVERY_FIELDS
+) -> Optional[ArtistProfile]:
+    """Variante asynchrone de get_artist_data (mêmes caches, même forme de résultat)."""
+    return await _artist_data_flights.do_async(
+        (_normalize_query(artist_name), fields),
+        _fetch_artist_data_async,
+        spotify,
+        artist_name,
+        fields,
+    )
+
+
+async def _fetch_artist_data_async(
+    spotify: AsyncSpotify, artist_name: str, fields: FrozenSet[str]
+) -> Optional[ArtistProfile]:
     try:
-        results = spotify.search(q=artist_name, type="artist", limit=1)
-        if not results["artists"]["items"]:
+        artist_id, search_hit = await _resolve_artist_async(spotify, artist_name)
+        if not artist_id:
             return None
 
-        artist = results["artists"]["items"][0]
-        artist_id = artist["id"]
-
-        artist_info = spotify.artist(artist_id)
-        top_tracks = spotify.artist_top_tracks(artist_id, country="FR")
-        albums = spotify.artist_albums(artist_id, album_type="album", limit=5)
-
-        try:
-            related_artists = spotify.artist_related_artists(artist_id)
-            related = related_artists["artists"][:10]
-        except Exception:
-            related = []
-            st.info(t("errors.spotify_related_info"))
-
-        return {
-            "info": artist_info,
-            "top_tracks": top_tracks["tracks"],
-            "albums": albums["items"],
-            "related_artists": related,
-            "genres": artist_info["genres"],
-            "popularity": artist_info["popularity"],
-            "followers": artist_info["followers"]["total"],
+        fetchers = {
+            "top_tracks": lambda: spotify.artist_top_tracks(artist_id, country="FR"),
+            "related_artists": lambda: _first_related_artists(spotify, artist_id),
         }
+        fetchers = {group: fetch for group, fetch in fetchers.items() if group in fields}
+        known = search_hit or await asyncio.to_thread(entity_store.artist, artist_id)
+        if known is None:
+            fetchers["info"] = lambda: spotify.artist(artist_id)
+        outcomes = await asyncio.gather(
+            *(
+                _cached_artist_field_async(group, artist_id, fetch)
+                for group, fetch in fetchers.items()
+            ),
+            return_exceptions=True,
+        )
+        results = dict(zip(fetchers, outcomes))
+        artist_info = results.pop("info", known)
+        if isinstance(artist_info, BaseException):
+            raise artist_info
+
+        values: Dict[str, List[Dict]] = {}
+        for group, outcome in results.items():
+            if isinstance(outcome, BaseException):
+                values[group] = []
+                _report_missing_field(group)
+            else:
+                values[group] = outcome
+        return await asyncio.to_thread(_assemble_artist_data, artist_info, values)
     except Exception as e:
-        st.error(t("errors.spotify_fetch", error=str(e)))
+        emit(_fetch_failure(artist_name, e))
         return None
+
+
+async def _first_related_artists(spotify: AsyncSpotify, artist_id: str) -> List[Dict]:
+    return (await spotify.artist_related_artists(artist_id))[:10]
@@ -0,0 +1,265 @@
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from services.settings import CACHE_DIR, env_float, env_int, env_str
+
+TRACING_ENABLED = env_str("MDAI_TRACING", "1").lower() not in {"0", "false", "no"}
+TRACE_LOG_PATH = Path(env_str("MDAI_TRACE_LOG", str(CACHE_DIR / "traces.jsonl")))
+TRACE_LOG_MAX_BYTES = env_int("MDAI_TRACE_LOG_MAX_BYTES", 50 * 1024 * 1024)
+METRICS_FILE_PATH = Path(env_str("MDAI_METRICS_FILE", str(CACHE_DIR / "metrics.prom")))
+METRICS_PORT = env_int("MDAI_METRICS_PORT", 0)
+METRICS_HOST = env_str("MDAI_METRICS_HOST", "127.0.0.1")
+METRICS_WINDOW = env_int("MDAI_METRICS_WINDOW", 2048)
+METRICS_QUANTILES = (0.5, 0.95, 0.99)
+# Les spans sont écrits par lots en arrière-plan, jamais sur le chemin de la requête.
+TRACE_FLUSH_INTERVAL = env_float("MDAI_TRACE_FLUSH_INTERVAL", 2.0)
+# Au-delà (disque lent ou plein), les spans les plus anciens non écrits sont abandonnés.
+TRACE_BUFFER_MAX = 50_000
+
+# Attributs numériques cumulés dans les métriques Prometheus.
+COUNTED_ATTRIBUTES = ("retries", "bytes", "prompt_tokens", "completion_tokens")
+
+
+class Span:
+    """Mesure d'une étape du pipeline ou d'un appel sortant."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start", "status", "attributes", "_started"
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.status = "ok"
+        self.attributes = dict(attributes)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class _StageMetrics:
+    __slots__ = ("durations", "count", "total", "statuses", "counters")
+
+    def __init__(self) -> None:
+        self.durations: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self.count = 0
+        self.total = 0.0
+        self.statuses: Dict[str, int] = {}
+        self.counters: Dict[str, float] = {}
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_metrics: Dict[str, _StageMetrics] = {}
+_metrics_lock = threading.Lock()
+_trace_log_lock = threading.Lock()
+_pending_traces: Deque[Dict[str, Any]] = deque(maxlen=TRACE_BUFFER_MAX)
+_metrics_dirty = threading.Event()
+_flusher: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+_metrics_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_span(name: str, **attributes: Any) -> Span:
+    """Ouvre un span enfant du span courant sans le rendre courant (utile dans un générateur)."""
+    return Span(name, _current_span.get(), attributes)
+
+
+def finish_span(current: Span, error: Optional[BaseException] = None) -> None:
+    if error is not None:
+        current.status = "error"
+        current.set(error=type(error).__name__)
+    if TRACING_ENABLED:
+        _record(current, time.perf_counter() - current._started)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Chronomètre un bloc ; les spans imbriqués partagent le même trace_id."""
+    current = start_span(name, **attributes)
+    token = _current_span.set(current)
+    error: Optional[BaseException] = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_span.reset(token)
+        finish_span(current, error)
+
+
+def _record(current: Span, duration: float) -> None:
+    with _metrics_lock:
+        stage = _metrics.setdefault(current.name, _StageMetrics())
+        stage.durations.append(duration)
+        stage.count += 1
+        stage.total += duration
+        stage.statuses[current.status] = stage.statuses.get(current.status, 0) + 1
+        for attribute in COUNTED_ATTRIBUTES:
+            value = current.attributes.get(attribute)
+            if isinstance(value, (int, float)):
+                stage.counters[attribute] = stage.counters.get(attribute, 0) + value
+
+    _pending_traces.append(
+        {
+            "trace_id": current.trace_id,
+            "span_id": current.span_id,
+            "parent_id": current.parent_id,
+            "name": current.name,
+            "start": round(current.start, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "status": current.status,
+            **current.attributes,
+        }
+    )
+    if current.parent_id is None:
+        _metrics_dirty.set()
+    _ensure_flusher()
+
+
+def _ensure_flusher() -> None:
+    global _flusher
+    if _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="mdai-traces", daemon=True)
+            _flusher.start()
+            atexit.register(flush_traces)
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(TRACE_FLUSH_INTERVAL)
+        flush_traces()
+
+
+def flush_traces() -> None:
+    """Écrit les spans en attente, et le fichier de métriques si une trace s'est terminée."""
+    records = []
+    with _flusher_lock:
+        while _pending_traces:
+            records.append(_pending_traces.popleft())
+    if records:
+        _append_traces(records)
+    if _metrics_dirty.is_set():
+        _metrics_dirty.clear()
+        export_metrics()
+
+
+def _append_traces(records: List[Dict[str, Any]]) -> None:
+    lines = "".join(
+        json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records
+    )
+    with _trace_log_lock:
+        try:
+            TRACE_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            if TRACE_LOG_PATH.exists() and TRACE_LOG_PATH.stat().st_size > TRACE_LOG_MAX_BYTES:
+                os.replace(TRACE_LOG_PATH, TRACE_LOG_PATH.with_suffix(".jsonl.1"))
+            with TRACE_LOG_PATH.open("a", encoding="utf-8") as trace_log:
+                trace_log.write(lines)
+        except OSError:
+            pass
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def render_prometheus() -> str:
+    """Métriques au format texte Prometheus : quantiles de latence et compteurs par span."""
+    lines = [
+        "# HELP mdai_span_duration_seconds Span duration over the recent window.",
+        "# TYPE mdai_span_duration_seconds summary",
+    ]
+    counter_lines: List[str] = []
+    status_lines: List[str] = []
+    with _metrics_lock:
+        for name, stage in sorted(_metrics.items()):
+            label = _label(name)
+            ordered = sorted(stage.durations)
+            for q in METRICS_QUANTILES:
+                lines.append(
+                    f'mdai_span_duration_seconds{{span="{label}",quantile="{q}"}} '
+                    f"{_quantile(ordered, q):.6f}"
+                )
+            lines.append(f'mdai_span_duration_seconds_sum{{span="{label}"}} {stage.total:.6f}')
+            lines.append(f'mdai_span_duration_seconds_count{{span="{label}"}} {stage.count}')
+            for status, count in sorted(stage.statuses.items()):
+                status_lines.append(
+                    f'mdai_span_total{{span="{label}",status="{_label(status)}"}} {count}'
+                )
+            for attribute, value in sorted(stage.counters.items()):
+                counter_lines.append(f'mdai_span_{attribute}_total{{span="{label}"}} {value:g}')
+
+    lines += ["# HELP mdai_span_total Finished spans by status.", "# TYPE mdai_span_total counter"]
+    lines += status_lines
+    for attribute in COUNTED_ATTRIBUTES:
+        lines.append(f"# TYPE mdai_span_{attribute}_total counter")
+        lines += [line for line in counter_lines if line.startswith(f"mdai_span_{attribute}_total")]
+    return "\n".join(lines) + "\n"
+
+
+def export_metrics() -> None:
+    """Écrit les métriques dans METRICS_FILE_PATH (remplacement atomique)."""
+    try:
+        METRICS_FILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = METRICS_FILE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(render_prometheus(), encoding="utf-8")
+        os.replace(tmp_path, METRICS_FILE_PATH)
+    except OSError:
+        pass
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def start_metrics_server() -> None:
+    """Expose /metrics sur MDAI_METRICS_HOST, port MDAI_METRICS_PORT (une fois par process)."""
+    global _metrics_server
+    if not METRICS_PORT or not TRACING_ENABLED:
+        return
+    with _metrics_lock:
+        if _metrics_server is not None:
+            return
+        try:
+            _metrics_server = ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), _MetricsHandler)
+        except OSError:
+            return
+    threading.Thread(
+        target=_metrics_server.serve_forever, name="mdai-metrics", daemon=True
+    ).start()
@@ -0,0 +1,250 @@
+import asyncio
+import importlib.util
+import re
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from services.ratelimit import (
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_RETRIES,
+    get_rate_limiter,
+    retry_after_seconds,
+    take_token,
+    take_token_async,
+)
+from services.settings import env_float, env_int, env_str
+from services.tracing import span
+
+HTTP_POOL_MAXSIZE = env_int("MDAI_HTTP_POOL_MAXSIZE", 32)
+HTTP_KEEPALIVE_CONNECTIONS = env_int("MDAI_HTTP_KEEPALIVE_CONNECTIONS", 16)
+HTTP_CONNECT_TIMEOUT = env_float("MDAI_HTTP_CONNECT_TIMEOUT", 5.0)
+HTTP_READ_TIMEOUT = env_float("MDAI_HTTP_READ_TIMEOUT", 30.0)
+HTTP2_REQUESTED = env_str("MDAI_HTTP2", "0").lower() in {"1", "true", "yes"}
+
+# Nombre de tentatives par service : Spotify reprend la politique par défaut de spotipy,
+# YouTube n'en fait aucune (un 403 de quota doit remonter tout de suite).
+UPSTREAM_RETRIES: Dict[str, int] = {
+    "spotify": 3,
+    "spotify-accounts": 3,
+    "youtube": 0,
+}
+
+# Segments de chemin variables (identifiants Spotify, nombres) regroupés sous un même span.
+_PATH_ID_PATTERN = re.compile(r"^(?:\d+|[0-9A-Za-z]{16,})$")
+
+# Statuts relancés par les variantes asynchrones, comme la politique urllib3 de get_session.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF = 0.3
+
+_sessions: Dict[str, requests.Session] = {}
+_httpx_clients: Dict[str, httpx.Client] = {}
+# Un client asynchrone est lié à la boucle d'évènements qui l'a créé : boucle -> {service: client}.
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def http2_enabled() -> bool:
+    """HTTP/2 n'est actif que s'il est demandé et que le paquet h2 est installé."""
+    return HTTP2_REQUESTED and importlib.util.find_spec("h2") is not None
+
+
+def request_timeout(read: Optional[float] = None) -> Tuple[float, float]:
+    return HTTP_CONNECT_TIMEOUT, read if read is not None else HTTP_READ_TIMEOUT
+
+
+def endpoint_route(url: str) -> str:
+    """Chemin de l'URL sans paramètres ni identifiants : /v1/artists/{id}/top-tracks."""
+    segments = urlsplit(url).path.split("/")
+    return "/".join("{id}" if _PATH_ID_PATTERN.match(segment) else segment for segment in segments)
+
+
+class TracedSession(requests.Session):
+    """Session dont chaque requête produit un span (durée, statut HTTP, tentatives, octets)."""
+
+    def __init__(self, upstream: str):
+        super().__init__()
+        self.upstream = upstream
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:
+        name = f"{self.upstream}:{method.upper()} {endpoint_route(url)}"
+        limiter = get_rate_limiter(self.upstream)
+        with span(name, upstream=self.upstream) as current:
+            queued = 0.0
+            throttled = 0
+            while True:
+                if limiter is not None:
+                    queued += take_token(self.upstream, limiter)
+                response = super().request(method, url, *args, **kwargs)
+                if limiter is None or response.status_code != 429:
+                    break
+                # Le 429 concerne toute l'application : toutes les sessions attendent ensemble.
+                delay = retry_after_seconds(response.headers)
+                limiter.pause(delay)
+                if throttled >= RATE_LIMIT_RETRIES or delay > RATE_LIMIT_MAX_WAIT:
+                    break
+                throttled += 1
+            retries = getattr(getattr(response.raw, "retries", None), "history", ())
+            current.set(
+                http_status=response.status_code,
+                retries=len(retries) + throttled,
+                bytes=len(response.content),
+            )
+            if limiter is not None:
+                current.set(queued_ms=round(queued * 1000, 1))
+            if response.status_code >= 400:
+                current.status = f"http_{response.status_code}"
+            return response
+
+
+def _retry_statuses(upstream: str) -> Tuple[int, ...]:
+    """Les 429 d'un service limité sont gérés par son ordonnanceur, pas par urllib3."""
+    if get_rate_limiter(upstream) is not None:
+        return tuple(status for status in RETRY_STATUSES if status != 429)
+    return RETRY_STATUSES
+
+
+def get_session(upstream: str) -> requests.Session:
+    """Session requests partagée par tout le process, avec un pool keep-alive par hôte."""
+    with _lock:
+        session = _sessions.get(upstream)
+        if session is None:
+            retries = UPSTREAM_RETRIES.get(upstream, 0)
+            retry = Retry(
+                total=retries,
+                connect=None,
+                read=False,
+                allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+                status=retries,
+                backoff_factor=0.3,
+                status_forcelist=_retry_statuses(upstream) if retries else (),
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                max_retries=retry,
+            )
+            session = TracedSession(upstream)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[upstream] = session
+        return session
+
+
+class BorrowedSession(requests.Session):
+    """Session prêtée à une bibliothèque qui ferme la sienne (spotipy, à sa destruction).
+
+    Les requêtes passent par la session partagée de get_session ; close() ne ferme que
+    les adaptateurs propres à cet objet, jamais le pool keep-alive commun.
+    """
+
+    def __init__(self, upstream: str):
+        super().__init__()
+        self._shared = get_session(upstream)
+
+    def request(self, *args: Any, **kwargs: Any) -> requests.Response:
+        return self._shared.request(*args, **kwargs)
+
+
+def get_httpx_client(upstream: str) -> httpx.Client:
+    """Client httpx partagé (keep-alive, HTTP/2 optionnel), utilisé pour OpenAI."""
+    with _lock:
+        client = _httpx_clients.get(upstream)
+        if client is None:
+            client = httpx.Client(
+                http2=http2_enabled(),
+                limits=_httpx_limits(),
+                timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                follow_redirects=True,
+            )
+            _httpx_clients[upstream] = client
+        return client
+
+
+def _httpx_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_POOL_MAXSIZE,
+        max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+    )
+
+
+def get_async_client(upstream: str) -> httpx.AsyncClient:
+    """Client httpx asynchrone partagé par toutes les tâches de la boucle d'évènements courante."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(upstream)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=http2_enabled(),
+                limits=_httpx_limits(),
+                timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                follow_redirects=True,
+            )
+            clients[upstream] = client
+        return client
+
+
+async def close_async_clients() -> None:
+    """Ferme les clients asynchrones de la boucle courante (à appeler avant de la quitter)."""
+    with _lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+    backoff = RETRY_BACKOFF * (2 ** attempt)
+    if response is None:
+        return backoff
+    return retry_after_seconds(response.headers, backoff)
+
+
+async def async_request(
+    upstream: str, method: str, url: str, *, timeout: Optional[float] = None, **kwargs: Any
+) -> httpx.Response:
+    """Requête asynchrone tracée, avec les mêmes tentatives par service que get_session."""
+    client = get_async_client(upstream)
+    limiter = get_rate_limiter(upstream)
+    retries = UPSTREAM_RETRIES.get(upstream, 0)
+    timeouts = httpx.Timeout(timeout or HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+    with span(f"{upstream}:{method.upper()} {endpoint_route(url)}", upstream=upstream) as current:
+        attempt = 0
+        queued = 0.0
+        while True:
+            response: Optional[httpx.Response] = None
+            if limiter is not None:
+                queued += await take_token_async(upstream, limiter)
+            try:
+                response = await client.request(method, url, timeout=timeouts, **kwargs)
+            except (httpx.ConnectError, httpx.TimeoutException):
+                if attempt >= retries:
+                    raise
+            else:
+                if limiter is not None and response.status_code == 429:
+                    delay = retry_after_seconds(response.headers)
+                    limiter.pause(delay)
+                    if attempt >= RATE_LIMIT_RETRIES or delay > RATE_LIMIT_MAX_WAIT:
+                        break
+                    attempt += 1
+                    continue
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    break
+            delay = _retry_delay(response, attempt)
+            if response is not None and delay > RATE_LIMIT_MAX_WAIT:
+                break
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        current.set(http_status=response.status_code, retries=attempt, bytes=len(response.content))
+        if limiter is not None:
+            current.set(queued_ms=round(queued * 1000, 1))
+        if response.status_code >= 400:
+            current.status = f"http_{response.status_code}"
+        return response
@@ -0,0 +1,100 @@
+import bisect
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.settings import env_int
+
+TYPEAHEAD_MAX_QUERIES = env_int("MDAI_TYPEAHEAD_MAX_QUERIES", 1024)
+TYPEAHEAD_MAX_ARTISTS = env_int("MDAI_TYPEAHEAD_MAX_ARTISTS", 50_000)
+
+
+def normalize_prefix(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def artist_summary(artist: Dict) -> Dict:
+    """Champs d'un artiste Spotify utiles aux suggestions."""
+    return {
+        "id": artist["id"],
+        "name": artist["name"],
+        "genres": artist.get("genres", [])[:1],
+        "followers": (artist.get("followers") or {}).get("total", 0),
+        "popularity": artist.get("popularity", 0),
+    }
+
+
+class TypeaheadIndex:
+    """LRU des dernières requêtes et index de préfixes des artistes déjà rencontrés."""
+
+    def __init__(self, max_queries: int, max_artists: int):
+        self._max_queries = max_queries
+        self._max_artists = max_artists
+        self._lock = threading.Lock()
+        self._recent: "OrderedDict[Tuple[str, int], List[Dict]]" = OrderedDict()
+        self._artists: "OrderedDict[str, Dict]" = OrderedDict()
+        self._prefixes: List[Tuple[str, str]] = []
+
+    def lookup(self, query: str, limit: int) -> Optional[List[Dict]]:
+        """Suggestions servies localement, ou None s'il faut interroger Spotify."""
+        key = normalize_prefix(query)
+        with self._lock:
+            recent = self._recent.get((key, limit))
+            if recent is not None:
+                self._recent.move_to_end((key, limit))
+                return list(recent)
+
+            matches = self._prefix_matches(key)
+            if len(matches) < limit:
+                return None
+            matches.sort(key=lambda artist: artist["popularity"], reverse=True)
+            return matches[:limit]
+
+    def remember_query(self, query: str, limit: int, artists: Iterable[Dict]) -> None:
+        summaries = [artist_summary(artist) for artist in artists if artist]
+        with self._lock:
+            self._recent[(normalize_prefix(query), limit)] = summaries
+            self._recent.move_to_end((normalize_prefix(query), limit))
+            while len(self._recent) > self._max_queries:
+                self._recent.popitem(last=False)
+            self._add(summaries)
+
+    def remember_artists(self, artists: Iterable[Dict]) -> None:
+        summaries = [artist_summary(artist) for artist in artists if artist and artist.get("id")]
+        with self._lock:
+            self._add(summaries)
+
+    def _prefix_matches(self, key: str) -> List[Dict]:
+        start = bisect.bisect_left(self._prefixes, (key, ""))
+        seen: Dict[str, Dict] = {}
+        for prefix, artist_id in self._prefixes[start:]:
+            if not prefix.startswith(key):
+                break
+            if artist_id in self._artists:
+                seen[artist_id] = self._artists[artist_id]
+        return list(seen.values())
+
+    def _add(self, summaries: List[Dict]) -> None:
+        for summary in summaries:
+            artist_id = summary["id"]
+            if artist_id not in self._artists:
+                for word_start in _word_starts(summary["name"]):
+                    bisect.insort(self._prefixes, (word_start, artist_id))
+            self._artists[artist_id] = summary
+            self._artists.move_to_end(artist_id)
+
+        evicted = set()
+        while len(self._artists) > self._max_artists:
+            artist_id, _ = self._artists.popitem(last=False)
+            evicted.add(artist_id)
+        if evicted:
+            self._prefixes = [entry for entry in self._prefixes if entry[1] not in evicted]
+
+
+def _word_starts(name: str) -> List[str]:
+    """Le nom complet et chaque suffixe commençant par un mot ("the beatles", "beatles")."""
+    words = normalize_prefix(name).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+typeahead_index = TypeaheadIndex(TYPEAHEAD_MAX_QUERIES, TYPEAHEAD_MAX_ARTISTS)
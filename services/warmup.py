@@ -0,0 +1,107 @@
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import spotipy
+
+from services.concurrency import get_pool
+from services.discovery import run_discovery
+from services.localization import SUPPORTED_LOCALES
+from services.ratelimit import BACKGROUND, request_priority
+from services.result_store import RESULT_STORE_TTL
+from services.settings import env_float, env_int, env_str
+from services.tracing import span
+
+WARMUP_ENABLED = env_str("MDAI_WARMUP", "1").lower() not in {"0", "false", "no"}
+WARMUP_SEEDS = env_str("MDAI_WARMUP_SEEDS", "")
+WARMUP_SEEDS_FILE = env_str("MDAI_WARMUP_SEEDS_FILE", "")
+WARMUP_WORKERS = max(env_int("MDAI_WARMUP_WORKERS", 2), 1)
+WARMUP_PACING = env_float("MDAI_WARMUP_PACING", 2.0)
+WARMUP_INTERVAL = env_float("MDAI_WARMUP_INTERVAL", 6 * 3600)
+
+_started = False
+_started_lock = threading.Lock()
+
+
+def warmup_seeds(default_seeds: Iterable[str]) -> List[str]:
+    """Artistes à préchauffer : ceux de l'interface, puis MDAI_WARMUP_SEEDS et MDAI_WARMUP_SEEDS_FILE."""
+    seeds = list(default_seeds) + WARMUP_SEEDS.split(",")
+    if WARMUP_SEEDS_FILE:
+        try:
+            seeds += Path(WARMUP_SEEDS_FILE).read_text(encoding="utf-8").splitlines()
+        except OSError:
+            pass
+
+    unique: List[str] = []
+    seen = set()
+    for seed in seeds:
+        seed = seed.strip()
+        if seed and not seed.startswith("#") and seed.casefold() not in seen:
+            seen.add(seed.casefold())
+            unique.append(seed)
+    return unique
+
+
+def _warm_seed(spotify: spotipy.Spotify, artist_name: str, openai_api_key: str, locale: str) -> None:
+    # Un résultat qui expirerait avant le prochain passage est recalculé dès maintenant.
+    max_age = max(RESULT_STORE_TTL - 2 * WARMUP_INTERVAL, 0) if WARMUP_INTERVAL > 0 else None
+    try:
+        with span("warmup.seed", locale=locale), request_priority(BACKGROUND):
+            run_discovery(
+                spotify,
+                artist_name,
+                openai_api_key,
+                locale=locale,
+                max_result_age=max_age,
+            )
+    except Exception:
+        pass
+
+
+def run_warmup_round(spotify: spotipy.Spotify, openai_api_key: str, seeds: List[str]) -> None:
+    """Calcule (ou rafraîchit) le résultat de chaque artiste, dans chaque langue.
+
+    Les lancements sont espacés de WARMUP_PACING secondes et au plus WARMUP_WORKERS
+    découvertes tournent en même temps, en plus des limites par service externe.
+    """
+    pool = get_pool("warmup", WARMUP_WORKERS)
+    futures = []
+    for artist_name in seeds:
+        for locale in sorted(SUPPORTED_LOCALES):
+            futures.append(pool.submit(_warm_seed, spotify, artist_name, openai_api_key, locale))
+            time.sleep(WARMUP_PACING)
+    for future in futures:
+        future.result()
+
+
+def _warmup_loop(spotify: spotipy.Spotify, openai_api_key: str, seeds: List[str]) -> None:
+    while True:
+        run_warmup_round(spotify, openai_api_key, seeds)
+        if WARMUP_INTERVAL <= 0:
+            return
+        time.sleep(WARMUP_INTERVAL)
+
+
+def cache_warmup_pending() -> bool:
+    """Vrai tant que le préchauffage est activé et pas encore démarré dans ce process."""
+    return WARMUP_ENABLED and not _started
+
+
+def start_cache_warmup(
+    spotify: Optional[spotipy.Spotify], openai_api_key: str, default_seeds: Iterable[str]
+) -> bool:
+    """Démarre une seule fois par process le préchauffage périodique ; renvoie True s'il tourne."""
+    global _started
+    if not WARMUP_ENABLED or spotify is None or not openai_api_key:
+        return False
+    with _started_lock:
+        if not _started:
+            _started = True
+            threading.Thread(
+                target=_warmup_loop,
+                args=(spotify, openai_api_key, warmup_seeds(default_seeds)),
+                name="mdai-warmup",
+                daemon=True,
+            ).start()
+    return True
@@ -1,59 +1,481 @@
-from typing import Optional
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 
-import requests
-import streamlit as st
+from services.cache import get_cache
+from services.concurrency import async_upstream_slot, get_pool, upstream_slot
+from services.events import ServiceWarning, emit
+from services.records import SpotifyMatch, Track
+from services.settings import DAY, env_float, env_int
+from services.singleflight import SingleFlight
+from services.tracing import span
+from services.transport import async_request, get_session, request_timeout
 
-from ui.i18n import t
+YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+YOUTUBE_QUERY_TIMEOUT = 10
+YOUTUBE_HEDGE_WIDTH = max(env_int("MDAI_YOUTUBE_HEDGE_WIDTH", 3), 1)
+YOUTUBE_LOOKUP_DEADLINE = env_float("MDAI_YOUTUBE_LOOKUP_DEADLINE", 15.0)
+YOUTUBE_QUERY_WORKERS = env_int("MDAI_YOUTUBE_QUERY_WORKERS", 12)
+YOUTUBE_CACHE_TTL = env_float("MDAI_YOUTUBE_CACHE_TTL", 30 * DAY)
+YOUTUBE_MISS_TTL = env_float("MDAI_YOUTUBE_MISS_TTL", DAY)
+
+# Quota YouTube Data API : 10 000 unités/jour par défaut, 100 par recherche.
+YOUTUBE_SEARCH_COST = 100
+YOUTUBE_DAILY_QUOTA = env_int("MDAI_YOUTUBE_DAILY_QUOTA", 10_000)
+YOUTUBE_QUOTA_RESERVE = env_int("MDAI_YOUTUBE_QUOTA_RESERVE", 500)
+YOUTUBE_QUOTA_LEDGER_DAYS = 64
+
+YOUTUBE_PREFETCH_COUNT = env_int("MDAI_YOUTUBE_PREFETCH_COUNT", 3)
+YOUTUBE_PREFETCH_WORKERS = env_int("MDAI_YOUTUBE_PREFETCH_WORKERS", 4)
+
+_pending_videos: Dict[Tuple[str, str], Future] = {}
+_pending_lock = threading.Lock()
+_lookup_flights = SingleFlight("youtube.lookup")
+
+
+def _search_queries(artist_name: str, track_name: str) -> List[str]:
+    """Variantes de requête, de la plus précise à la plus large."""
+    return [
+        f'"{artist_name}" "{track_name}" official',
+        f"{artist_name} {track_name} official",
+        f"{artist_name} {track_name}",
+        f'"{artist_name}" official',
+        artist_name,
+    ]
+
+
+def _search_params(query: str, youtube_api_key: str) -> Dict[str, Any]:
+    return {
+        "part": "snippet",
+        "q": query,
+        "type": "video",
+        "maxResults": 3,
+        "key": youtube_api_key,
+        "order": "relevance",
+        "videoDuration": "any",
+        "videoEmbeddable": "true",
+    }
+
+
+def _query_outcome(status_code: int, payload: Any, youtube_api_key: str) -> Tuple[str, Optional[str]]:
+    """Seule une réponse 200 sans résultat est une absence de vidéo ; 5xx, 429… sont des erreurs."""
+    if status_code == 200:
+        if payload.get("items"):
+            video_id = payload["items"][0]["id"]["videoId"]
+            return "found", f"https://www.youtube.com/watch?v={video_id}"
+        return "miss", None
+    if status_code == 403:
+        _exhaust_quota(youtube_api_key)
+        return "quota", None
+    return "error", None
+
+
+def _run_youtube_query(query: str, youtube_api_key: str, timeout: float) -> Tuple[str, Optional[str]]:
+    _charge_quota(youtube_api_key, YOUTUBE_SEARCH_COST)
+    response = get_session("youtube").get(
+        YOUTUBE_SEARCH_URL,
+        params=_search_params(query, youtube_api_key),
+        timeout=request_timeout(timeout),
+    )
+    payload = response.json() if response.status_code == 200 else None
+    return _query_outcome(response.status_code, payload, youtube_api_key)
+
+
+async def _run_youtube_query_async(
+    query: str, youtube_api_key: str, timeout: float
+) -> Tuple[str, Optional[str]]:
+    # Le registre de quota est dans SQLite : ses accès bloquants passent par un thread.
+    await asyncio.to_thread(_charge_quota, youtube_api_key, YOUTUBE_SEARCH_COST)
+    response = await async_request(
+        "youtube",
+        "GET",
+        YOUTUBE_SEARCH_URL,
+        params=_search_params(query, youtube_api_key),
+        timeout=timeout,
+    )
+    payload = response.json() if response.status_code == 200 else None
+    return await asyncio.to_thread(_query_outcome, response.status_code, payload, youtube_api_key)
+
+
+def _wave_decision(
+    outcomes: List[Optional[Tuple[str, Optional[str]]]]
+) -> Optional[Tuple[str, Optional[str]]]:
+    """Issue d'une vague dès qu'elle est connue : quota épuisé, ou meilleure variante trouvée."""
+    if any(outcome and outcome[0] == "quota" for outcome in outcomes):
+        return "quota", None
+    for outcome in outcomes:
+        if outcome is None:
+            return None
+        if outcome[0] == "found":
+            return outcome
+    return None
+
+
+def _final_status(outcomes: List[Tuple[str, Optional[str]]]) -> str:
+    """Aucune variante trouvée : absence de vidéo, sauf si une requête a échoué en route."""
+    return "error" if any(outcome[0] == "error" for outcome in outcomes) else "miss"
+
+
+def _lookup_key(artist_name: str, track_name: str, youtube_api_key: str) -> Tuple[str, str, str]:
+    # La clé d'API en fait partie : quota et erreurs 403 sont propres à chaque clé.
+    return artist_name.casefold(), track_name.casefold(), _key_hash(youtube_api_key)
+
+
+def _key_hash(youtube_api_key: str) -> str:
+    return hashlib.sha256(youtube_api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _lookup_video(
+    artist_name: str, track_name: str, youtube_api_key: str
+) -> Tuple[str, Optional[str]]:
+    return _lookup_flights.do(
+        _lookup_key(artist_name, track_name, youtube_api_key),
+        _traced_lookup,
+        artist_name,
+        track_name,
+        youtube_api_key,
+    )
+
+
+def _traced_lookup(
+    artist_name: str, track_name: str, youtube_api_key: str
+) -> Tuple[str, Optional[str]]:
+    with span("youtube.lookup") as lookup_span:
+        status, youtube_url = _hedged_lookup(artist_name, track_name, youtube_api_key)
+        lookup_span.set(outcome=status)
+        if status in ("quota", "timeout", "error"):
+            lookup_span.status = status
+    return status, youtube_url
+
+
+def _hedged_lookup(
+    artist_name: str, track_name: str, youtube_api_key: str
+) -> Tuple[str, Optional[str]]:
+    """Renvoie (statut, url) avec statut parmi found, miss, quota, timeout ou error.
+
+    Les variantes sont lancées par vagues de YOUTUBE_HEDGE_WIDTH requêtes
+    simultanées : la meilleure variante aboutie est retenue dès que toutes
+    les variantes plus précises ont échoué, le reste est annulé.
+    """
+    pool = get_pool("youtube-query", YOUTUBE_QUERY_WORKERS)
+    deadline = time.monotonic() + YOUTUBE_LOOKUP_DEADLINE
+    search_queries = _search_queries(artist_name, track_name)
+    failed: List[Tuple[str, Optional[str]]] = []
+
+    for wave_start in range(0, len(search_queries), YOUTUBE_HEDGE_WIDTH):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return "timeout", None
+
+        wave_queries = search_queries[wave_start : wave_start + YOUTUBE_HEDGE_WIDTH]
+        if not _quota_allows(youtube_api_key, len(wave_queries) * YOUTUBE_SEARCH_COST):
+            return "quota", None
+
+        timeout = min(YOUTUBE_QUERY_TIMEOUT, remaining)
+        wave = [
+            pool.submit(_run_youtube_query, query, youtube_api_key, timeout)
+            for query in wave_queries
+        ]
+        outcomes: List[Optional[Tuple[str, Optional[str]]]] = [None] * len(wave)
+        pending = set(wave)
+
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=max(deadline - time.monotonic(), 0),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for future in done:
+                try:
+                    outcomes[wave.index(future)] = future.result()
+                except Exception:
+                    outcomes[wave.index(future)] = ("error", None)
+
+            decision = _wave_decision(outcomes)
+            if decision:
+                _cancel(pending)
+                return decision
+
+        if pending:
+            _cancel(pending)
+            return "timeout", None
+        failed.extend(outcomes)
+
+    return _final_status(failed), None
+
+
+async def _lookup_video_async(
+    artist_name: str, track_name: str, youtube_api_key: str
+) -> Tuple[str, Optional[str]]:
+    return await _lookup_flights.do_async(
+        _lookup_key(artist_name, track_name, youtube_api_key),
+        _hedged_lookup_async,
+        artist_name,
+        track_name,
+        youtube_api_key,
+    )
+
+
+async def _hedged_lookup_async(
+    artist_name: str, track_name: str, youtube_api_key: str
+) -> Tuple[str, Optional[str]]:
+    """Même cascade que _lookup_video, chaque vague étant un groupe de tâches asyncio."""
+    with span("youtube.lookup") as lookup_span:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + YOUTUBE_LOOKUP_DEADLINE
+        status, youtube_url = "miss", None
+        search_queries = _search_queries(artist_name, track_name)
+        failed: List[Tuple[str, Optional[str]]] = []
+
+        for wave_start in range(0, len(search_queries), YOUTUBE_HEDGE_WIDTH):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                status = "timeout"
+                break
+            wave_queries = search_queries[wave_start : wave_start + YOUTUBE_HEDGE_WIDTH]
+            units = len(wave_queries) * YOUTUBE_SEARCH_COST
+            if not await asyncio.to_thread(_quota_allows, youtube_api_key, units):
+                status = "quota"
+                break
+
+            timeout = min(YOUTUBE_QUERY_TIMEOUT, remaining)
+            wave = [
+                asyncio.ensure_future(_run_youtube_query_async(query, youtube_api_key, timeout))
+                for query in wave_queries
+            ]
+            outcomes: List[Optional[Tuple[str, Optional[str]]]] = [None] * len(wave)
+            pending = set(wave)
+            decision = None
+            while pending and decision is None:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(deadline - loop.time(), 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                for task in done:
+                    outcome = None if task.exception() else task.result()
+                    outcomes[wave.index(task)] = outcome or ("error", None)
+                decision = _wave_decision(outcomes)
+
+            for task in pending:
+                task.cancel()
+            if decision:
+                status, youtube_url = decision
+                break
+            if pending:
+                status = "timeout"
+                break
+            failed.extend(outcomes)
+        else:
+            status = _final_status(failed)
+
+        lookup_span.set(outcome=status)
+        if status in ("quota", "timeout", "error"):
+            lookup_span.status = status
+    return status, youtube_url
+
+
+def find_youtube_video(
+    artist_name: str, track_name: str, youtube_api_key: str
+) -> Tuple[Optional[str], bool]:
+    """Cherche une vidéo YouTube ; renvoie (url, quota_dépassé) sans rien afficher."""
+    if not youtube_api_key:
+        return None, False
+    status, youtube_url = _lookup_video(artist_name, track_name, youtube_api_key)
+    return youtube_url, status == "quota"
+
+
+async def find_youtube_video_async(
+    artist_name: str, track_name: str, youtube_api_key: str
+) -> Tuple[Optional[str], bool]:
+    """Variante asynchrone de find_youtube_video."""
+    if not youtube_api_key:
+        return None, False
+    async with async_upstream_slot("youtube"):
+        status, youtube_url = await _lookup_video_async(artist_name, track_name, youtube_api_key)
+    return youtube_url, status == "quota"
+
+
+def find_cached_youtube_video(
+    artist_id: str,
+    track: Track,
+    artist_name: str,
+    youtube_api_key: str,
+) -> Tuple[Optional[str], bool]:
+    """Comme find_youtube_video, avec le cache persistant (artiste, morceau).
+
+    Les absences de vidéo sont aussi mises en cache, pour une durée plus courte.
+    Quand le budget de quota du jour est presque épuisé, seul le cache répond.
+    """
+    status, youtube_url = _find_cached_video(artist_id, track, artist_name, youtube_api_key)
+    return youtube_url, status == "quota"
+
+
+def _find_cached_video(
+    artist_id: str, track: Track, artist_name: str, youtube_api_key: str
+) -> Tuple[str, Optional[str]]:
+    """Renvoie (statut, url) ; une erreur passagère (réseau, 5xx, 429) n'est pas mise en cache."""
+    cache_key = f"{artist_id}:{track.id or track.name}"
+    cache = get_cache()
+    cached_url = cache.get("youtube_video", cache_key, YOUTUBE_CACHE_TTL)
+    if cached_url:
+        return "found", cached_url
+    if cache.get("youtube_video_miss", cache_key, YOUTUBE_MISS_TTL):
+        return "miss", None
+    if not youtube_api_key:
+        return "miss", None
+
+    status, youtube_url = _lookup_video(artist_name, track.name, youtube_api_key)
+    if status == "found":
+        cache.set("youtube_video", cache_key, youtube_url)
+    elif status == "miss":
+        cache.set("youtube_video_miss", cache_key, True)
+    return status, youtube_url
+
+
+def _quota_day() -> str:
+    try:
+        return datetime.now(ZoneInfo("America/Los_Angeles")).date().isoformat()
+    except Exception:
+        return datetime.now(timezone.utc).date().isoformat()
+
+
+def _quota_key(youtube_api_key: str) -> str:
+    key_hash = hashlib.sha256(youtube_api_key.encode("utf-8")).hexdigest()[:16]
+    return f"{key_hash}:{_quota_day()}"
+
+
+def youtube_quota_used(youtube_api_key: str) -> int:
+    """Unités de quota consommées aujourd'hui (jour Pacifique, comme Google) pour cette clé."""
+    return int(get_cache().get("youtube_quota", _quota_key(youtube_api_key)) or 0)
+
+
+def _quota_allows(youtube_api_key: str, units: int) -> bool:
+    remaining = YOUTUBE_DAILY_QUOTA - youtube_quota_used(youtube_api_key)
+    return remaining - units >= YOUTUBE_QUOTA_RESERVE
+
+
+def _charge_quota(youtube_api_key: str, units: int) -> None:
+    cache = get_cache()
+    cache.incr("youtube_quota", _quota_key(youtube_api_key), units)
+    cache.evict("youtube_quota", YOUTUBE_QUOTA_LEDGER_DAYS)
+
+
+def _exhaust_quota(youtube_api_key: str) -> None:
+    used = youtube_quota_used(youtube_api_key)
+    if used < YOUTUBE_DAILY_QUOTA:
+        get_cache().incr("youtube_quota", _quota_key(youtube_api_key), YOUTUBE_DAILY_QUOTA - used)
+
+
+def _cancel(futures: Iterable[Future]) -> None:
+    for future in futures:
+        future.cancel()
 
 
 def search_youtube_videos(
     artist_name: str, track_name: str, youtube_api_key: str
 ) -> Optional[str]:
     """Recherche une vidéo YouTube pour un artiste et une chanson."""
-    try:
-        if not youtube_api_key:
-            return None
+    youtube_url, quota_exceeded = find_youtube_video(artist_name, track_name, youtube_api_key)
+    if quota_exceeded:
+        emit(ServiceWarning("errors.youtube_quota"))
+    return youtube_url
+
+
+async def search_youtube_videos_async(
+    artist_name: str, track_name: str, youtube_api_key: str
+) -> Optional[str]:
+    """Variante asynchrone de search_youtube_videos."""
+    youtube_url, quota_exceeded = await find_youtube_video_async(
+        artist_name, track_name, youtube_api_key
+    )
+    if quota_exceeded:
+        emit(ServiceWarning("errors.youtube_quota"))
+    return youtube_url
+
+
+def _resolve_video(rec: Dict, youtube_api_key: str) -> Tuple[str, Optional[str]]:
+    spotify_data: SpotifyMatch = rec["spotify_data"]
+    with upstream_slot("youtube"):
+        status, youtube_url = _find_cached_video(
+            spotify_data.artist.id, spotify_data.top_tracks[0], rec["name"], youtube_api_key
+        )
+    _apply_video(spotify_data, status, youtube_url)
+    return status, youtube_url
 
-        search_queries = [
-            f'"{artist_name}" "{track_name}" official',
-            f"{artist_name} {track_name} official",
-            f"{artist_name} {track_name}",
-            f'"{artist_name}" official',
-            artist_name,
-        ]
 
-        youtube_search_url = "https://www.googleapis.com/youtube/v3/search"
-
-        for query in search_queries:
-            try:
-                params = {
-                    "part": "snippet",
-                    "q": query,
-                    "type": "video",
-                    "maxResults": 3,
-                    "key": youtube_api_key,
-                    "order": "relevance",
-                    "videoDuration": "any",
-                    "videoEmbeddable": "true",
-                }
-
-                response = requests.get(youtube_search_url, params=params, timeout=10)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get("items"):
-                        video_id = data["items"][0]["id"]["videoId"]
-                        return f"https://www.youtube.com/watch?v={video_id}"
-                elif response.status_code == 403:
-                    st.warning(t("errors.youtube_quota"))
-                    return None
-
-            except Exception:
-                continue
-
-        return None
+def _apply_video(spotify_data: SpotifyMatch, status: str, youtube_url: Optional[str]) -> None:
+    # Quota épuisé ou erreur passagère : la vidéo reste à résoudre (et n'est pas enregistrée).
+    if status not in ("quota", "error"):
+        spotify_data.youtube_url = youtube_url
+        spotify_data.youtube_resolved = True
+
+
+def _video_future(rec: Dict, youtube_api_key: str) -> Future:
+    # Partagé entre sessions : seule la recommandation de la session créatrice est mise à
+    # jour par le worker, les autres reportent le résultat sur la leur.
+    key = (rec["spotify_data"].artist.id, _key_hash(youtube_api_key))
+    created = False
+    with _pending_lock:
+        future = _pending_videos.get(key)
+        if future is None:
+            future = get_pool("youtube", YOUTUBE_PREFETCH_WORKERS).submit(
+                _resolve_video, rec, youtube_api_key
+            )
+            _pending_videos[key] = future
+            created = True
+    # Hors du verrou : le callback s'exécute immédiatement si le futur est déjà terminé.
+    if created:
+        future.add_done_callback(lambda done: _forget_pending(key, done))
+    return future
+
+
+def _forget_pending(key: Tuple[str, str], future: Future) -> None:
+    with _pending_lock:
+        if _pending_videos.get(key) is future:
+            del _pending_videos[key]
+
+
+def _needs_video(rec: Dict, youtube_api_key: str) -> bool:
+    spotify_data: Optional[SpotifyMatch] = rec.get("spotify_data")
+    return bool(
+        youtube_api_key
+        and spotify_data
+        and spotify_data.top_tracks
+        and not spotify_data.youtube_resolved
+    )
+
+
+def resolve_recommendation_video(rec: Dict, youtube_api_key: str) -> Tuple[Optional[str], bool]:
+    """Résout la vidéo d'une recommandation à la demande et la mémorise sur celle-ci.
+
+    Renvoie (url, quota_dépassé) ; réutilise un préchargement en cours s'il existe.
+    """
+    if not _needs_video(rec, youtube_api_key):
+        spotify_data = rec.get("spotify_data")
+        return (spotify_data.youtube_url if spotify_data else None), False
+    try:
+        status, youtube_url = _video_future(rec, youtube_api_key).result()
     except Exception:
-        return None
+        return None, False
+    _apply_video(rec["spotify_data"], status, youtube_url)
+    return youtube_url, status == "quota"
+
+
+def prefetch_recommendation_videos(recommendations: List[Dict], youtube_api_key: str) -> None:
+    """Précharge en arrière-plan la vidéo des recommandations les mieux classées."""
+    for rec in recommendations[:YOUTUBE_PREFETCH_COUNT]:
+        if _needs_video(rec, youtube_api_key):
+            _video_future(rec, youtube_api_key)
 
 
 def get_youtube_embed_url(youtube_url: str) -> str:
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Cache et traces des tests hors du dossier du projet.
+os.environ.setdefault("MDAI_CACHE_DIR", tempfile.mkdtemp(prefix="mdai-tests-"))
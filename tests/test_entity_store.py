@@ -0,0 +1,62 @@
+from services import openai_service, spotify_service
+from services.entity_store import EntityStore
+
+
+def artist_payload(artist_id, name, popularity=50):
+    return {
+        "id": artist_id,
+        "name": name,
+        "genres": ["trip hop"],
+        "popularity": popularity,
+        "followers": {"total": 10},
+        "images": [],
+        "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+    }
+
+
+class StubSpotify:
+    def __init__(self, payloads):
+        self.payloads = {payload["id"]: payload for payload in payloads}
+        self.requested = []
+
+    def artists(self, artist_ids):
+        self.requested.extend(artist_ids)
+        return {"artists": [self.payloads.get(artist_id) for artist_id in artist_ids]}
+
+
+def test_fresh_artists_are_not_requested_again(monkeypatch):
+    store = EntityStore(max_artists=100, max_tracks=100, ttl=60)
+    store.remember_artists([artist_payload("known", "Portishead")])
+    monkeypatch.setattr(openai_service, "entity_store", store)
+    spotify = StubSpotify([artist_payload("missing", "Massive Attack")])
+
+    metadata = openai_service._fetch_artists_metadata(spotify, ["known", "missing"])
+
+    assert spotify.requested == ["missing"]
+    assert {artist_id: artist.name for artist_id, artist in metadata.items()} == {
+        "known": "Portishead",
+        "missing": "Massive Attack",
+    }
+    assert store.artist("missing").name == "Massive Attack"
+
+
+def test_expired_artist_is_requested_again(monkeypatch):
+    store = EntityStore(max_artists=100, max_tracks=100, ttl=-1)
+    store.remember_artists([artist_payload("stale", "Tricky")])
+    monkeypatch.setattr(openai_service, "entity_store", store)
+    spotify = StubSpotify([artist_payload("stale", "Tricky")])
+
+    openai_service._fetch_artists_metadata(spotify, ["stale"])
+
+    assert spotify.requested == ["stale"]
+
+
+def test_profile_uses_known_artist(monkeypatch):
+    store = EntityStore(max_artists=100, max_tracks=100, ttl=60)
+    store.remember_artists([artist_payload("known", "Portishead")])
+    monkeypatch.setattr(spotify_service, "entity_store", store)
+
+    profile = spotify_service._assemble_artist_data(store.artist("known"), {"top_tracks": []})
+
+    assert profile.artist.name == "Portishead"
+    assert store.top_tracks("known") == []
@@ -0,0 +1,134 @@
+import pytest
+
+from services import openai_service
+from services.entity_store import EntityStore
+from services.name_resolver import normalize_name, pick_artist
+from services.records import Artist
+
+
+def artist_payload(artist_id, name, popularity=50):
+    return {
+        "id": artist_id,
+        "name": name,
+        "genres": [],
+        "popularity": popularity,
+        "followers": {"total": 0},
+        "images": [],
+        "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+    }
+
+
+NEAR_MISSES = [("Justice", "Justine"), ("Air", "Airs"), ("Low", "Lowe")]
+
+
+@pytest.fixture
+def store():
+    return EntityStore(max_artists=100, max_tracks=100, ttl=60)
+
+
+@pytest.mark.parametrize("name, known", NEAR_MISSES)
+def test_near_miss_is_not_resolved_locally(store, name, known):
+    store.remember_artists([artist_payload("known", known, popularity=90)])
+    assert store.artist_by_name(name) is None
+
+
+@pytest.mark.parametrize(
+    "name, known",
+    [
+        ("beyonce", "Beyoncé"),
+        ("the beatles!", "The Beatles"),
+        ("Simon & Garfunkel", "Simon and Garfunkel"),
+    ],
+)
+def test_exact_normalized_match_is_resolved_locally(store, name, known):
+    store.remember_artists([artist_payload("known", known)])
+    assert store.artist_by_name(name).id == "known"
+
+
+def test_most_popular_homonym_wins(store):
+    store.remember_artists(
+        [artist_payload("small", "Justice", popularity=10), artist_payload("big", "Justice", 80)]
+    )
+    assert store.artist_by_name("justice").id == "big"
+
+
+def test_renamed_artist_leaves_old_name(store):
+    store.remember_artists([artist_payload("a", "Justine")])
+    store.remember_artists([artist_payload("a", "Justice")])
+    assert store.artist_by_name("Justine") is None
+    assert store.artist_by_name("Justice").id == "a"
+
+
+def test_evicted_artist_leaves_name_index():
+    store = EntityStore(max_artists=1, max_tracks=1, ttl=60)
+    store.remember_artists([artist_payload("a", "Air"), artist_payload("b", "Low")])
+    assert store.artist_by_name("Air") is None
+    assert store._names == {normalize_name("Low"): {"b"}}
+
+
+@pytest.mark.parametrize(
+    "raw, normalized",
+    [("The Beatles", "beatles"), ("Beyoncé", "beyonce"), ("AC/DC", "ac dc"), ("!!!", "!!!")],
+)
+def test_normalize_name(raw, normalized):
+    assert normalize_name(raw) == normalized
+
+
+@pytest.mark.parametrize("name, near", NEAR_MISSES)
+def test_exact_candidate_beats_more_popular_near_miss(name, near):
+    candidates = [
+        Artist.from_spotify(artist_payload("near", near, popularity=100)),
+        Artist.from_spotify(artist_payload("exact", name, popularity=0)),
+    ]
+    assert pick_artist(name, candidates).id == "exact"
+
+
+SHORT_NEAR_MISSES = NEAR_MISSES + [
+    ("Lowe", "Low"),
+    ("The Kooks", "The Kinks"),
+    ("Moderat", "Moderato"),
+]
+
+
+@pytest.mark.parametrize("name, near", SHORT_NEAR_MISSES)
+def test_short_near_miss_without_exact_candidate_is_rejected(name, near):
+    candidates = [Artist.from_spotify(artist_payload("near", near, popularity=100))]
+    assert pick_artist(name, candidates) is None
+
+
+@pytest.mark.parametrize(
+    "name, known", [("Portished", "Portishead"), ("Massive Atack", "Massive Attack")]
+)
+def test_long_name_typo_is_accepted(name, known):
+    candidates = [Artist.from_spotify(artist_payload("known", known))]
+    assert pick_artist(name, candidates).id == "known"
+
+
+def test_no_close_candidate_is_rejected():
+    assert pick_artist("Justice", [Artist.from_spotify(artist_payload("x", "Daft Punk"))]) is None
+
+
+class StubSpotify:
+    def __init__(self, items):
+        self.items = items
+        self.searches = []
+
+    def search(self, q, type, limit):
+        self.searches.append(q)
+        return {"artists": {"items": self.items}}
+
+    def artist_top_tracks(self, artist_id, country):
+        return {"tracks": []}
+
+
+def test_near_miss_goes_to_spotify_search(monkeypatch, store):
+    monkeypatch.setattr(openai_service, "entity_store", store)
+    store.remember_artists([artist_payload("justine", "Justine", popularity=90)])
+    spotify = StubSpotify(
+        [artist_payload("justine", "Justine", 90), artist_payload("justice", "Justice", 60)]
+    )
+
+    found = openai_service._search_recommendation(spotify, {"name": "Justice"})
+
+    assert spotify.searches == ["Justice"]
+    assert found["artist"].id == "justice"
@@ -0,0 +1,32 @@
+from services.records import Artist, ArtistProfile, SpotifyMatch
+from services.result_store import load_result, save_result, store_resolved_videos
+
+
+def recommendation(name, youtube_url=None):
+    spotify_data = SpotifyMatch(artist=Artist(id=name.lower(), name=name))
+    if youtube_url is not None:
+        spotify_data.youtube_url = youtube_url
+        spotify_data.youtube_resolved = True
+    return {"name": name, "spotify_data": spotify_data}
+
+
+def test_regenerated_result_forgets_previous_videos():
+    profile = ArtistProfile(artist=Artist(id="seed-regenerated", name="Seed"))
+    save_result(profile, {"artists": [recommendation("A", "https://youtu.be/old")]}, "fr")
+    rid = save_result(profile, {"artists": [recommendation("A")]}, "fr")
+
+    store_resolved_videos(rid, [recommendation("A", "https://youtu.be/new")])
+
+    stored = load_result(rid)["recommendations"]["artists"][0]["spotify_data"]
+    assert stored.youtube_resolved
+    assert stored.youtube_url == "https://youtu.be/new"
+
+
+def test_known_videos_are_not_rewritten():
+    profile = ArtistProfile(artist=Artist(id="seed-known", name="Seed"))
+    rid = save_result(profile, {"artists": [recommendation("A", "https://youtu.be/kept")]}, "fr")
+
+    store_resolved_videos(rid, [recommendation("A", "https://youtu.be/other")])
+
+    stored = load_result(rid)["recommendations"]["artists"][0]["spotify_data"]
+    assert stored.youtube_url == "https://youtu.be/kept"
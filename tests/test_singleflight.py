@@ -0,0 +1,52 @@
+import threading
+import time
+
+import pytest
+
+from services.singleflight import SingleFlight, StreamAborted
+
+
+def follow(stream, received, errors):
+    try:
+        for item in stream:
+            received.append(item)
+    except Exception as e:
+        errors.append(e)
+
+
+def numbers():
+    yield from range(5)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("complete", [True, False])
+def test_follower_sees_whether_the_shared_stream_completed(complete):
+    flights = SingleFlight("test")
+    leader = flights.stream("key", numbers)
+    assert next(leader) == 0
+
+    received, errors = [], []
+    follower = threading.Thread(
+        target=follow, args=(flights.stream("key", numbers), received, errors), daemon=True
+    )
+    follower.start()
+    assert next(leader) == 1
+    wait_for(lambda: len(received) == 2)
+
+    if complete:
+        assert list(leader) == [2, 3, 4]
+    else:
+        leader.close()
+    follower.join(5)
+
+    if complete:
+        assert received == [0, 1, 2, 3, 4] and not errors
+    else:
+        assert received == [0, 1]
+        assert len(errors) == 1 and isinstance(errors[0], StreamAborted)
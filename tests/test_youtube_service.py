@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+from services import youtube_service
+from services.cache import get_cache
+from services.records import Track
+
+
+class StubResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class StubSession:
+    def __init__(self, respond):
+        self.respond = respond
+
+    def get(self, url, params, timeout):
+        return self.respond()
+
+
+def refuse():
+    raise requests.ConnectionError("connection refused")
+
+
+def lookup(monkeypatch, artist_id, respond):
+    monkeypatch.setattr(youtube_service, "get_session", lambda upstream: StubSession(respond))
+    track = Track(id=f"{artist_id}-track", name="Song")
+    return youtube_service.find_cached_youtube_video(artist_id, track, "Artist", "test-key")
+
+
+def is_cached_miss(artist_id):
+    return bool(get_cache().get("youtube_video_miss", f"{artist_id}:{artist_id}-track"))
+
+
+@pytest.mark.parametrize(
+    "artist_id, respond",
+    [
+        ("refused", refuse),
+        ("server-error", lambda: StubResponse(500)),
+        ("rate-limited", lambda: StubResponse(429)),
+    ],
+)
+def test_transient_failure_is_not_cached_as_miss(monkeypatch, artist_id, respond):
+    assert lookup(monkeypatch, artist_id, respond) == (None, False)
+    assert not is_cached_miss(artist_id)
+
+
+def test_empty_result_is_cached_as_miss(monkeypatch):
+    assert lookup(monkeypatch, "empty", lambda: StubResponse(200, {"items": []})) == (None, False)
+    assert is_cached_miss("empty")
+
+
+def test_found_video_is_returned(monkeypatch):
+    payload = {"items": [{"id": {"videoId": "abc"}}]}
+    url, quota_exceeded = lookup(monkeypatch, "found", lambda: StubResponse(200, payload))
+    assert url == "https://www.youtube.com/watch?v=abc"
+    assert not quota_exceeded
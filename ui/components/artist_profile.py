@@ -1,16 +1,17 @@
+from services.records import ArtistProfile
 from services.spotify_service import format_followers
 from ui.i18n import t
 from ui.theme import esc, render_html
 
 
-def render_artist_profile(artist_data: dict, analysis: str) -> None:
-    artist_info = artist_data["info"]
-    name = artist_info["name"]
+def render_artist_profile(artist_data: ArtistProfile, analysis: str) -> None:
+    artist = artist_data.artist
+    name = artist.name
     initial = name[0].upper() if name else "?"
-    genres = " · ".join(artist_data["genres"][:4]) or t("results.unspecified")
-    followers = format_followers(artist_data["followers"])
-    popularity = artist_data["popularity"]
-    image_url = artist_info["images"][0]["url"] if artist_info.get("images") else None
+    genres = " · ".join(artist.genres[:4]) or t("results.unspecified")
+    followers = format_followers(artist.followers)
+    popularity = artist.popularity
+    image_url = artist.image
 
     if image_url:
         avatar_html = (
@@ -2,8 +2,10 @@ from dataclasses import dataclass
 
 import streamlit as st
 
+from services.events import collect_events
 from services.spotify_service import initialize_spotify
 from ui.components.lang_switch import render_lang_switch
+from ui.components.layout import render_events
 from ui.i18n import t
 
 
@@ -140,8 +142,11 @@ def render_config_sidebar() -> AppConfig:
 
         if not auto_mode and spotify_client_id and spotify_client_secret:
             if st.button(t("sidebar.test_spotify")):
-                with st.spinner(t("sidebar.testing_spotify")):
-                    spotify_client = initialize_spotify(spotify_client_id, spotify_client_secret)
+                with st.spinner(t("sidebar.testing_spotify")), collect_events() as events:
+                    spotify_client = initialize_spotify(
+                        spotify_client_id, spotify_client_secret, revalidate=True
+                    )
+                    render_events(events)
                     if spotify_client:
                         st.session_state.spotify_client = spotify_client
                         st.success(t("sidebar.spotify_ok"))
@@ -84,7 +84,7 @@ def filter_and_sort_artists(artists: list, filter_type: str, sort_by: str) -> li
     if sort_by == "popularity":
         return sorted(
             filtered,
-            key=lambda a: a.get("spotify_data", {}).get("popularity", 0),
+            key=lambda a: a["spotify_data"].artist.popularity,
             reverse=True,
         )
     return sorted(filtered, key=lambda a: a.get("confidence", 0), reverse=True)
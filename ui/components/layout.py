@@ -1,9 +1,10 @@
-from typing import Callable
+from typing import Callable, List
 
 import streamlit as st
 
+from services.events import ServiceEvent
 from ui.components.lang_switch import render_lang_switch
-from ui.i18n import t
+from ui.i18n import get_locale, t
 from ui.theme import EXAMPLE_ARTISTS, esc, render_html
 
 
@@ -110,3 +111,10 @@ def render_no_result(query: str, on_example: Callable[[str], None], on_home: Cal
     render_html("</div>")
     if st.button(t("no_result.home"), key="noresult_home"):
         on_home()
+
+
+def render_events(events: List[ServiceEvent]) -> None:
+    """Affiche les évènements (info, warning, error) remontés par les services, dans la langue active."""
+    locale = get_locale()
+    for event in events:
+        getattr(st, event.level)(event.message(locale))
@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Callable, List, Optional
 
 import streamlit as st
 
@@ -10,14 +10,16 @@ def render_recommendation_card(
     rec: dict,
     rank: int,
     index: int,
-    on_select: Callable[[int], None],
+    on_select: Optional[Callable[[int], None]],
 ) -> None:
     style = similarity_style(rec.get("similarity_type", ""))
     name = rec["name"]
     initial = name[0].upper() if name else "?"
     sim_label = similarity_label(rec.get("similarity_type", ""))
     confidence = rec.get("confidence", 0)
-    image_url = rec.get("spotify_data", {}).get("image")
+    # Les aperçus du streaming n'ont pas encore de correspondance Spotify.
+    spotify_data = rec.get("spotify_data")
+    image_url = spotify_data.artist.image if spotify_data else None
 
     if image_url:
         avatar_inner = f'<img src="{esc(image_url)}" alt="{esc(name)}" style="width:100%;height:100%;object-fit:cover;border-radius:14px">'
@@ -51,6 +53,8 @@ def render_recommendation_card(
 
     with st.container():
         render_html(card_html)
+        if on_select is None:
+            return
         st.button(
             " ",
             key=f"reco_open_{index}",
@@ -60,3 +64,9 @@ def render_recommendation_card(
             use_container_width=True,
             type="secondary",
         )
+
+
+def render_recommendation_previews(recommendations: List[dict]) -> None:
+    """Cartes non cliquables affichées au fil du streaming, avant vérification Spotify."""
+    for rank, rec in enumerate(recommendations, 1):
+        render_recommendation_card(rec, rank=rank, index=rank - 1, on_select=None)
@@ -17,14 +17,15 @@ def render_recommendation_detail(
     style = similarity_style(rec.get("similarity_type", ""))
     name = rec["name"]
     initial = name[0].upper() if name else "?"
-    spotify_data = rec.get("spotify_data", {})
-    genres = " · ".join(spotify_data.get("genres", [])[:4]) or t("results.varied")
+    spotify_data = rec["spotify_data"]
+    artist = spotify_data.artist
+    genres = " · ".join(artist.genres[:4]) or t("results.varied")
     confidence = rec.get("confidence", 0)
-    popularity = spotify_data.get("popularity", 0)
-    spotify_url = spotify_data.get("external_urls", {}).get("spotify", "")
-    top_tracks = spotify_data.get("top_tracks", [])
-    youtube_url = spotify_data.get("youtube_url")
-    image_url = spotify_data.get("image")
+    popularity = artist.popularity
+    spotify_url = artist.spotify_url
+    top_tracks = spotify_data.top_tracks
+    youtube_url = spotify_data.youtube_url
+    image_url = artist.image
     sim_label = similarity_label(rec.get("similarity_type", ""))
 
     if image_url:
@@ -80,7 +81,7 @@ def render_recommendation_detail(
     )
 
     if youtube_url:
-        top_name = top_tracks[0]["name"] if top_tracks else t("detail.top_track_fallback")
+        top_name = top_tracks[0].name if top_tracks else t("detail.top_track_fallback")
         render_html(
             f'<div style="font:700 10px/1 \'Space Mono\';letter-spacing:0.14em;text-transform:uppercase;'
             f'color:#6B6B78;margin:24px 0 11px">{esc(t("detail.video_youtube"))}</div>'
@@ -104,7 +105,7 @@ def render_recommendation_detail(
         <div style="font:400 10px/1 'Space Mono';color:#6B6B78;margin-top:6px;text-transform:uppercase;letter-spacing:0.08em">{esc(t("results.popularity"))}</div>
     </div>
     <div style="flex:1;background:#14141B;border:1px solid rgba(255,255,255,.06);border-radius:14px;padding:15px">
-        <div style="font:800 26px/1 'Bricolage Grotesque'">{esc(format_followers(spotify_data.get('followers', 0)))}</div>
+        <div style="font:800 26px/1 'Bricolage Grotesque'">{esc(format_followers(artist.followers))}</div>
         <div style="font:400 10px/1 'Space Mono';color:#6B6B78;margin-top:6px;text-transform:uppercase;letter-spacing:0.08em">{esc(t("results.followers"))}</div>
     </div>
 </div>
@@ -118,14 +119,14 @@ def render_recommendation_detail(
         )
         tracks_html = ""
         for i, track in enumerate(top_tracks, 1):
-            track_url = track.get("external_urls", {}).get("spotify", "")
+            track_url = track.spotify_url
             row_inner = f"""
 <div class="md-track-row">
     <div class="md-track-index">{i}</div>
     <div class="md-track-play" style="background:{style['tile']}">▶</div>
     <div class="md-track-meta">
-        <div class="md-track-name">{esc(track['name'])}</div>
-        <div class="md-track-album">{esc(track['album']['name'])}</div>
+        <div class="md-track-name">{esc(track.name)}</div>
+        <div class="md-track-album">{esc(track.album)}</div>
     </div>
     <div class="md-track-arrow">↗</div>
 </div>
@@ -133,7 +134,7 @@ def render_recommendation_detail(
             if track_url:
                 tracks_html += (
                     f'<a href="{esc(track_url)}" target="_blank" rel="noopener noreferrer" '
-                    f'class="md-track-row-link" aria-label="{esc(track["name"])}">'
+                    f'class="md-track-row-link" aria-label="{esc(track.name)}">'
                     f"{row_inner}</a>"
                 )
             else:
@@ -3,7 +3,7 @@ from typing import Callable, List
 import streamlit as st
 
 from services.spotify_service import search_artist_suggestions
-from ui.i18n import t
+from ui.i18n import get_locale, t
 from ui.theme import EXAMPLE_ARTISTS, esc
 
 
@@ -67,7 +67,7 @@ def render_search(
     suggestions: List[dict] = []
     if spotify_client and st.session_state.get("query", "").strip():
         suggestions = search_artist_suggestions(
-            spotify_client, st.session_state.query, limit=5
+            spotify_client, st.session_state.query, limit=5, locale=get_locale()
         )
 
     if suggestions and st.session_state.get("query", "").strip():
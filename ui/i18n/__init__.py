@@ -1,4 +1,6 @@
+from services.localization import use_locale
 from ui.i18n.i18n import (
+    SUPPORTED_LOCALES,
     clear_locale_switch_flag,
     get_locale,
     init_locale,
@@ -24,4 +26,6 @@ __all__ = [
     "similarity_label",
     "similarity_types",
     "normalize_similarity_type",
+    "use_locale",
+    "SUPPORTED_LOCALES",
 ]
@@ -1,32 +1,20 @@
-from typing import Dict, List, Optional
+from typing import Dict, List
 
 import streamlit as st
 import streamlit.components.v1 as components
 
+from services.localization import (
+    DEFAULT_LOCALE,
+    SIMILARITY_KEYS,
+    SUPPORTED_LOCALES,
+    locale_override,
+    normalize_similarity_type,
+    translate,
+)
 from ui.i18n.locales import en as en_messages
 from ui.i18n.locales import fr as fr_messages
 
-SUPPORTED_LOCALES = {"fr", "en"}
-DEFAULT_LOCALE = "fr"
-
-SIMILARITY_KEYS = (
-    "same_genre",
-    "historical_influence",
-    "creative_approach",
-    "surprise_discovery",
-)
-
-LEGACY_SIMILARITY_MAP: Dict[str, str] = {
-    "même genre": "same_genre",
-    "influence historique": "historical_influence",
-    "approche créative": "creative_approach",
-    "découverte surprenante": "surprise_discovery",
-    "same genre": "same_genre",
-    "historical influence": "historical_influence",
-    "creative approach": "creative_approach",
-    "surprise discovery": "surprise_discovery",
-}
-
+# Textes de l'interface ; les messages émis par les services restent dans services/locales.
 _CATALOGS: Dict[str, Dict[str, str]] = {
     "fr": fr_messages.MESSAGES,
     "en": en_messages.MESSAGES,
@@ -34,6 +22,9 @@ _CATALOGS: Dict[str, Dict[str, str]] = {
 
 
 def get_locale() -> str:
+    override = locale_override()
+    if override:
+        return override
     locale = st.session_state.get("locale", DEFAULT_LOCALE)
     return locale if locale in SUPPORTED_LOCALES else DEFAULT_LOCALE
 
@@ -60,7 +51,10 @@ def init_locale() -> None:
 
 def t(key: str, **kwargs) -> str:
     locale = get_locale()
-    message = _CATALOGS.get(locale, {}).get(key) or _CATALOGS[DEFAULT_LOCALE].get(key, key)
+    message = _CATALOGS[locale].get(key) or _CATALOGS[DEFAULT_LOCALE].get(key)
+    if message is None:
+        # Évènements et erreurs des services : leur catalogue fait foi.
+        return translate(key, locale, **kwargs)
     if kwargs:
         return message.format(**kwargs)
     return message
@@ -75,22 +69,6 @@ def loading_steps() -> List[str]:
     ]
 
 
-def normalize_similarity_type(raw: Optional[str]) -> str:
-    if not raw:
-        return "same_genre"
-    value = str(raw).strip()
-    if value in SIMILARITY_KEYS:
-        return value
-    normalized = LEGACY_SIMILARITY_MAP.get(value.lower(), LEGACY_SIMILARITY_MAP.get(value))
-    if normalized:
-        return normalized
-    lower = value.lower()
-    for legacy, stable in LEGACY_SIMILARITY_MAP.items():
-        if legacy.lower() == lower:
-            return stable
-    return "same_genre"
-
-
 def similarity_label(similarity_type: str) -> str:
     key = normalize_similarity_type(similarity_type)
     return t(f"similarity.{key}")
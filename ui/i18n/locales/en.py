@@ -30,7 +30,6 @@ MESSAGES = {
     "loading.step.ai": "AI style analysis",
     "loading.step.verify": "Verifying artists",
     "results.analyzed_artist": "Analyzed artist",
-    "results.unspecified": "Unspecified",
     "results.varied": "Varied",
     "results.followers": "Followers",
     "results.popularity": "Popularity",
@@ -42,9 +41,11 @@ MESSAGES = {
     "results.conf_short": "Conf.",
     "results.view_artist": "View {name}",
     "results.new_search": "New search",
+    "results.refresh": "Regenerate recommendations",
     "detail.listen_spotify": "▶ Listen on Spotify",
     "detail.why_reco": "✦ Why this pick",
     "detail.video_youtube": "Video · YouTube",
+    "detail.video_loading": "Looking for a video…",
     "detail.video_not_found": "YouTube video not found for this artist.",
     "detail.confidence": "AI confidence",
     "detail.top_tracks": "Top tracks",
@@ -87,13 +88,6 @@ MESSAGES = {
     "sidebar.accounts_youtube": "YouTube Data API:",
     "sidebar.accounts_optional": "(optional)",
     "sidebar.accounts_privacy": "Your keys stay private and are only used with official APIs",
-    "errors.spotify_connection": "Spotify connection error: {error}",
     "errors.spotify_failed": "Spotify connection failed",
-    "errors.spotify_fetch": "Error fetching data: {error}",
-    "errors.spotify_related_info": "ℹ️ Related artists unavailable for this artist, but AI will still make recommendations!",
-    "errors.ai": "AI error: {error}",
-    "errors.artist_not_found": "Artist '{name}' not found on Spotify",
-    "errors.youtube_quota": "⚠️ YouTube API quota exceeded or invalid key",
-    "spotify.meta": "{followers} followers · {genre}",
-    "spotify.genre_fallback": "music",
+    "errors.discovery_failed": "Discovery failed: {error}",
 }
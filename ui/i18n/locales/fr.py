@@ -30,7 +30,6 @@ MESSAGES = {
     "loading.step.ai": "Analyse du style par l'IA",
     "loading.step.verify": "Vérification des artistes",
     "results.analyzed_artist": "Artiste analysé",
-    "results.unspecified": "Non spécifié",
     "results.varied": "Varié",
     "results.followers": "Followers",
     "results.popularity": "Popularité",
@@ -42,9 +41,11 @@ MESSAGES = {
     "results.conf_short": "Conf.",
     "results.view_artist": "Voir {name}",
     "results.new_search": "Nouvelle recherche",
+    "results.refresh": "Régénérer les recommandations",
     "detail.listen_spotify": "▶ Écouter sur Spotify",
     "detail.why_reco": "✦ Pourquoi cette reco",
     "detail.video_youtube": "Vidéo · YouTube",
+    "detail.video_loading": "Recherche de la vidéo…",
     "detail.video_not_found": "Vidéo YouTube non trouvée pour cet artiste.",
     "detail.confidence": "Confiance IA",
     "detail.top_tracks": "Top tracks",
@@ -87,13 +88,6 @@ MESSAGES = {
     "sidebar.accounts_youtube": "YouTube Data API :",
     "sidebar.accounts_optional": "(optionnel)",
     "sidebar.accounts_privacy": "Vos clés restent privées et ne sont utilisées que pour les APIs officielles",
-    "errors.spotify_connection": "Erreur de connexion Spotify : {error}",
     "errors.spotify_failed": "Erreur de connexion Spotify",
-    "errors.spotify_fetch": "Erreur lors de la récupération des données : {error}",
-    "errors.spotify_related_info": "ℹ️ Artistes similaires indisponibles pour cet artiste, mais l'IA va quand même faire ses recommandations !",
-    "errors.ai": "Erreur IA : {error}",
-    "errors.artist_not_found": "Artiste '{name}' non trouvé sur Spotify",
-    "errors.youtube_quota": "⚠️ Quota YouTube API dépassé ou clé invalide",
-    "spotify.meta": "{followers} abonnés · {genre}",
-    "spotify.genre_fallback": "musique",
+    "errors.discovery_failed": "La découverte a échoué : {error}",
 }